@@ -39,36 +39,53 @@ import subprocess
 import platform
 from multiprocessing import freeze_support
 
-from turbo_tosec.database import DatabaseManager, DBConfig
+from turbo_tosec.database import DatabaseManager, DBConfig, PARTITION_COLUMNS
 from turbo_tosec.session import ImportSession
-from turbo_tosec.utils import get_dat_files
+from turbo_tosec.utils import get_dat_file_sizes
 from turbo_tosec._version import __version__
 
+# Compiled once at import time
+TOSEC_VERSION_PATTERN = re.compile(r"(TOSEC-v\d{4}-\d{2}-\d{2})", re.IGNORECASE)
+
 def setup_logging(log_file: str):
    
     for handler in logging.root.handlers[:]:
         logging.root.removeHandler(handler)
 
+    file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
+    # Only failures go to the log file; database progress messages are console-only
+    file_handler.setLevel(logging.ERROR)
     logging.basicConfig(level=logging.ERROR, 
             format="%(asctime)s [%(levelname)s] %(message)s",
-            handlers=[logging.FileHandler(log_file, mode='w', encoding='utf-8')]
+            handlers=[file_handler]
     )
 
+def setup_console_logging():
+    """Shows the database layer's progress messages on stdout (plain text, like the rest of the CLI output)."""
+    db_logger = logging.getLogger("turbo_tosec.database")
+    if db_logger.handlers:
+        return
+    
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    db_logger.addHandler(handler)
+    db_logger.setLevel(logging.INFO)
+
 def open_file_with_default_app(filepath):
-    """Opens a file with the OS default application."""
+    """Opens a file with the OS default application (fire-and-forget, does not wait for the viewer)."""
     try:
         if platform.system() == 'Windows':
             os.startfile(filepath)
-        elif platform.system() == 'Darwin': # macOS
-            subprocess.call(('open', filepath))
-        else: # Linux
-            subprocess.call(('xdg-open', filepath))
+        else:
+            opener = 'open' if platform.system() == 'Darwin' else 'xdg-open' # macOS / Linux
+            subprocess.Popen((opener, filepath), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, 
+                             close_fds=True, start_new_session=True)
     except Exception as e:
         print(f"\nCould not open log file automatically: {e}")
         
 def extract_tosec_version(path: str) -> str:
     # Example pattern: TOSEC-v2023-08-15
-    match = re.search(r"(TOSEC-v\d{4}-\d{2}-\d{2})", path, re.IGNORECASE)
+    match = TOSEC_VERSION_PATTERN.search(path)
     if match:
         return match.group(1)
     return "Unknown"
@@ -105,7 +122,8 @@ def run_scan_mode(args, log_filename: str):
     
     # 2. Scan for .dat files
     print(f"Scanning directory: {args.input}...")
-    all_dat_files = get_dat_files(args.input)
+    dat_sizes = get_dat_file_sizes(args.input) # sizes come from the scan, no second stat pass
+    all_dat_files = list(dat_sizes)
     
     if not all_dat_files:
         print("No .dat files found. Exiting.")
@@ -115,7 +133,10 @@ def run_scan_mode(args, log_filename: str):
     current_version = extract_tosec_version(args.input)
     print(f"Detected Input Version: {current_version}")
 
-    db_config = DBConfig(turbo=(args.workers > 1), memory=args.db_memory, threads=args.db_threads)
+    # The main connection does the bulk loads, so give it at least one thread per worker
+    db_threads = max(args.workers, args.db_threads)
+    db_config = DBConfig(turbo=(args.workers > 1), memory=args.db_memory, threads=db_threads, 
+                         stage_in_memory=args.stage_in_memory, temp_directory=args.db_temp_dir)
     # Database Context Manager for safe handling (auto connect/close)
     with DatabaseManager(args.output, config=db_config) as db:
         
@@ -139,14 +160,14 @@ def run_scan_mode(args, log_filename: str):
         
         # B. Version is compatible, ask about resuming
         else:
-            processed_files = db.get_processed_files()
-            if processed_files:
+            processed_count = db.count_processed_files()
+            if processed_count:
                 if args.resume:
                     resume_mode = True
                 elif args.force_new:
                     resume_mode = False
                 else:
-                    print(f"\nFound {len(processed_files)} processed files.")
+                    print(f"\nFound {processed_count} processed files.")
                     q = input("[R]esume or [S]tart fresh? [R/s]: ").lower()
                     resume_mode = (q != 's')
         
@@ -161,8 +182,7 @@ def run_scan_mode(args, log_filename: str):
         else:
             # Resume from last state
             print("Calculating resume list...")
-            processed_set = db.get_processed_files()
-            files_to_process = [f for f in all_dat_files if os.path.basename(f) not in processed_set]
+            files_to_process = db.filter_unprocessed(all_dat_files)
             
             skipped = len(all_dat_files) - len(files_to_process)
             print(f"Resuming: {skipped} files skipped. {len(files_to_process)} remaining.")
@@ -171,11 +191,27 @@ def run_scan_mode(args, log_filename: str):
             print("Nothing to do. All files processed.")
             return
 
-        db.configure_threads(args.workers)
-        
         # Start Session
         session = ImportSession(db_manager=db, args=args)
-        total_roms, error_count = session.run(files_to_process)
+        # Dropping the lookup indexes (one rebuild instead of per-row ART upkeep) only pays off when the load
+        # at least doubles the database; a small resume keeps them
+        rebuild_indexes = len(files_to_process) >= db.count_processed_files()
+        if rebuild_indexes:
+            db.drop_indexes()
+        try:
+            with db.transaction():
+                total_roms, error_count = session.run(files_to_process, sizes=dat_sizes)
+            
+            # Post-load layout: optional hash clustering (drops the indexes with the old table)
+            if args.cluster_by_hash:
+                print("Clustering ROMs by hash...")
+                db.cluster_by_hash()
+                rebuild_indexes = True
+        finally:
+            # Also after a failed run: the database is never left without its lookup indexes
+            if rebuild_indexes:
+                print("Building lookup indexes...")
+            db.create_indexes()
 
     end_time = time.time()
     duration = end_time - start_time
@@ -200,11 +236,12 @@ def run_parquet_mode(args):
     """
     Handles Parquet import/export operations.
     """
-    with DatabaseManager(args.db) as db:
+    with DatabaseManager(args.db, config=DBConfig(threads=args.workers)) as db:
         if args.export_file:
-            db.export_to_parquet(args.export_file, args.workers)
+            db.export_to_parquet(args.export_file, compression=args.compression, compression_level=args.compression_level,
+                                 row_group_size=args.row_group_size, partition_by=args.partition_by)
         elif args.import_file:
-            db.import_from_parquet(args.import_file, args.workers)
+            db.import_from_parquet(args.import_file)
 
 def main():
     
@@ -228,7 +265,7 @@ def main():
     parser_scan.add_argument("--input", "-i", required=True, help="The main directory path where the TOSEC DAT files are located.")
     parser_scan.add_argument("--output", "-o", default="tosec.duckdb", help="Name/path of the DuckDB file to be created.")
     parser_scan.add_argument("--workers", "-w", type=int, default=1, help="Number of worker threads (Default: 1). Tip: Use 0 to auto-detect CPU count.")
-    parser_scan.add_argument("--batch-size", "-b", type=int, default=1000, help="Number of rows to insert per batch transaction (Default: 1000).")
+    parser_scan.add_argument("--batch-size", "-b", type=int, default=100_000, help="Number of rows to insert per batch (Default: 100000). Larger batches mean fewer Python -> DuckDB round-trips at the cost of buffer RAM.")
     
     # Strategy Selection
     strategy_group = parser_scan.add_mutually_exclusive_group()
@@ -238,11 +275,21 @@ def main():
     strategy_group.add_argument("--legacy", action="store_true", help="[Strategy] In-Memory Mode (Old). XML -> DOM (RAM). High memory usage. Deprecated.")
 
     parser_scan.add_argument("--temp-dir", default="temp_chunks", help="Directory for temporary chunk files (used in --staged mode).")
+    parser_scan.add_argument("--direct-flush-threshold", type=int, default=100_000, help="Rows buffered per DuckDB insert in --direct mode (Default: 100000). Roughly tens of MB of RAM per 100k rows; larger means fewer inserts.")
     
     # Flags
     parser_scan.add_argument("--resume", action="store_true", help="Automatically resume if database exists.")
     parser_scan.add_argument("--force-new", action="store_true", help="Force overwrite existing database.")
     parser_scan.add_argument("--no-open-log", action="store_false", dest="open_log", default=True, help="Do NOT automatically open the log file if errors occur.")
+    parser_scan.add_argument("--cluster-by-hash", action="store_true", help="Rewrite the roms table ordered by sha1 after import (faster hash lookups, slower import).")
+    parser_scan.add_argument("--max-tasks-per-child", type=int, default=0, help="Replace each worker process after this many work items to release its memory (Python 3.11+, 0 = never). Workers then start via forkserver/spawn instead of the platform default. Default: 0.")
+    parser_scan.add_argument("--affinity", action="store_true", help="Pin each worker process to its own share of the CPU cores.")
+    
+    # Advanced Performance Tuning (consumed by DBConfig)
+    parser_scan.add_argument("--db-memory", type=str, default="75%", help="DuckDB memory limit (e.g., '8GB', '75%%'). Default: 75%% of RAM.")
+    parser_scan.add_argument("--db-threads", type=int, default=1, help="DuckDB threads per worker process. Default: 1 (Best for bulk insert).")
+    parser_scan.add_argument("--db-temp-dir", default=None, help="Directory where DuckDB spills out-of-core data in turbo mode (point it at a fast SSD).")
+    parser_scan.add_argument("--stage-in-memory", action="store_true", help="Build the database in RAM and write it to disk once at the end (needs RAM for the whole DB).")
  
     # Parquet Command (Import/Export)
     parser_parquet = subparsers.add_parser("parquet", help="Import/Export data using Parquet files.")
@@ -250,11 +297,11 @@ def main():
     parser_parquet.add_argument("--workers", "-w", type=int, default=1, help="Max threads for DuckDB engine (Default: 1).")
     group = parser_parquet.add_mutually_exclusive_group(required=True)
     group.add_argument("--import-file", "-i", help="Import FROM this Parquet file.")
-    group.add_argument("--export-file", "-o", help="Export TO this Parquet file.")
-    
-    # Advanced Performance Tuning
-    parser.add_argument("--db-memory", type=str, default="75%", help="DuckDB memory limit (e.g., '8GB', '75%%'). Default: 75%% of RAM.")
-    parser.add_argument("--db-threads", type=int, default=1, help="DuckDB threads per worker process. Default: 1 (Best for bulk insert).")
+    group.add_argument("--export-file", "-o", help="Export TO this Parquet file (a directory when --partition-by is used).")
+    parser_parquet.add_argument("--compression", choices=["zstd", "snappy", "none"], default="zstd", help="Parquet codec for exports (Default: zstd).")
+    parser_parquet.add_argument("--compression-level", type=int, default=3, help="ZSTD compression level for exports (Default: 3).")
+    parser_parquet.add_argument("--row-group-size", type=int, default=122880, help="Rows per Parquet row group for exports (Default: 122880).")
+    parser_parquet.add_argument("--partition-by", choices=PARTITION_COLUMNS, default=None, help="Write a Hive-partitioned directory split by this column.")
     
     if len(sys.argv) == 1:
         parser.print_help(sys.stderr)
@@ -283,6 +330,13 @@ def main():
     - Zero-Copy transfer to DuckDB. 
     - Minimal Disk I/O.
  
+  BATCH SIZE (--batch-size)
+ ---------------------------
+ Rows are flushed to DuckDB as one Arrow batch per --batch-size rows
+ (Default: 100000). Throughput depends on rows per statement, not on the
+ byte payload: small batches (< 4096) multiply Python -> DuckDB calls,
+ very large ones only grow the in-memory buffer.
+ 
  USAGE EXAMPLES
  ---------------------------
  $ turbo-tosec scan -i "./dats" --direct
@@ -297,6 +351,7 @@ def main():
         return
     
     log_filename = None
+    setup_console_logging()
     
     try:
         if args.command == "parquet":
@@ -307,6 +362,10 @@ def main():
                 print(f"  WARNING: Using {args.workers} threads.")
                 print("   If you are using a mechanical HDD, performance may drop due to seek time.")
                 print("   Recommended for HDD: 1-4 threads. Recommended for SSD: 4-16 threads.")
+            if args.batch_size < 4096:
+                print(f"  WARNING: --batch-size {args.batch_size} is very small.")
+                print("   Insert throughput depends on rows per statement; every flush is a separate DuckDB call.")
+                print("   Recommended: 16384-131072 rows (Default: 100000).")
             if not args.input:
                 parser.error("the following arguments are required: --input/-i")
                 
@@ -1,15 +1,92 @@
 import os
+import re
 import time
 import platform
 import ctypes
+import logging
+from contextlib import contextmanager
+from functools import lru_cache
 from typing import List, Tuple, Optional
 import duckdb
-from typing import NamedTuple
+import pyarrow as pa
+import pyarrow.compute as pc
+from typing import NamedTuple, Union
+
+from turbo_tosec.parser import RomColumns
+
+logger = logging.getLogger(__name__)
+
+# Columns that make sensible Hive partitions for Parquet exports (low cardinality)
+PARTITION_COLUMNS = ("platform", "category", "system", "status", "release_year", "dat_filename")
+# DuckDB row-group size: large inserts are split at this boundary so every slice
+# can be compressed and written out as a full row group on its own.
+BATCH_FLUSH_ROWS = 122880
+
+# Memory one DuckDB thread needs to load data without spilling (DuckDB's guidance: 125 MB+ per thread
+# for inserts, more for aggregations/joins). Used to cap the thread count under a memory limit.
+THREAD_MEMORY = 125 * 1024 * 1024
+
+# Lookup indexes on 'roms' (name -> columns). Built after bulk loads, never during them.
+ROM_INDEXES = {
+    "idx_roms_sha1": "sha1",
+    "idx_roms_crc_size": "crc, size",
+}
+# User-facing codec names -> DuckDB COPY codec names
+PARQUET_CODECS = {"zstd": "ZSTD", "snappy": "SNAPPY", "none": "UNCOMPRESSED"}
+
+class MEMORYSTATUSEX(ctypes.Structure):
+    """Win32 struct for GlobalMemoryStatusEx (defined once, not per call)."""
+    _fields_ = [
+        ('dwLength', ctypes.c_ulong),
+        ('dwMemoryLoad', ctypes.c_ulong),
+        ('ullTotalPhys', ctypes.c_ulonglong),
+        ('ullAvailPhys', ctypes.c_ulonglong),
+        ('ullTotalPageFile', ctypes.c_ulonglong),
+        ('ullAvailPageFile', ctypes.c_ulonglong),
+        ('ullTotalVirtual', ctypes.c_ulonglong),
+        ('ullAvailVirtual', ctypes.c_ulonglong),
+        ('ullAvailExtendedVirtual', ctypes.c_ulonglong),
+    ]
+
+@lru_cache(maxsize=1)
+def _get_total_ram_bytes() -> int:
+    """Total physical RAM in bytes (0 if unknown). Cached: it cannot change during the process lifetime."""
+    # for Windows
+    if platform.system() == "Windows":
+        mem_status = MEMORYSTATUSEX()
+        mem_status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(mem_status))
+        return mem_status.ullTotalPhys
+
+    # for Linux / Mac 
+    if "SC_PAGE_SIZE" in os.sysconf_names and "SC_PHYS_PAGES" in os.sysconf_names:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    
+    return 0
+
+def _parse_memory_size(limit_str: str) -> int:
+    """Parses DuckDB-style memory strings ('8GB', '512 MiB', '1.5TB') into bytes. Returns 0 if unparsable."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(I?B)?\s*", limit_str.upper())
+    if not match:
+        return 0
+    
+    value, unit = float(match.group(1)), match.group(2)
+    return int(value * 1024 ** " KMGT".index(unit or " "))
+
+def _sql_literal(value: str) -> str:
+    """
+    Quotes a string as a SQL literal. Only for statements that can't take a bound parameter
+    (ATTACH doesn't); everything else binds its values.
+    """
+    return "'" + value.replace("'", "''") + "'"
 
 class DBConfig(NamedTuple):
     memory: str = "4GB"
     threads: int = 1
     turbo: bool = False
+    checkpoint_threshold: str = "1GB"
+    temp_directory: Optional[str] = None   # Spill location for out-of-core operations (fast disk)
+    stage_in_memory: bool = False          # Work on an in-memory copy, write it to disk once on close()
     
 class DatabaseManager:
     """
@@ -22,6 +99,17 @@ class DatabaseManager:
         # If config is None use default config
         self.config = config or DBConfig()
         self.conn = None
+        self.staged_in_memory = self.config.stage_in_memory and db_path != ":memory:"
+        # Explicit transaction state (see transaction())
+        self.in_transaction = False
+        self.commit_every = 0
+        self.pending_batches = 0
+        # ROM rows (and their files) inserted since the last COMMIT, and what aborted transactions took with them
+        # (see _recover_aborted_transaction)
+        self.uncommitted_rows = 0
+        self.uncommitted_files = set()
+        self.rolled_back_rows = 0
+        self.rolled_back_files = []
         
     def __enter__(self):
         
@@ -30,14 +118,23 @@ class DatabaseManager:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         
-        self.close()
+        # After an error the in-memory staging copy may hold a partial or rolled back import: keep the file as it was
+        self.close(flush=exc_type is None)
 
     def connect(self):
         """Establishes connection and ensures schema exists."""
-        self.conn = duckdb.connect(self.db_path)
+        if self.staged_in_memory:
+            # All ingestion runs against RAM; the file is only written once in close()
+            logger.info("DB: In-memory staging engaged (written to %s on close)", self.db_path)
+            self.conn = duckdb.connect(":memory:")
+            self.conn.execute(f"ATTACH {_sql_literal(self.db_path)} AS disk")
+            self.conn.execute("COPY FROM DATABASE disk TO memory")
+        else:
+            self.conn = duckdb.connect(self.db_path)
         
+        memory_limit = None  # Only turbo mode sets one
         if self.config.turbo:
-            print(f"DB: Turbo Mode engaged (Low safety, High speed) | Mem: {self.config.memory} | Threads: {self.config.threads}")
+            logger.info("DB: Turbo Mode engaged (Low safety, High speed) | Mem: %s | Threads: %s", self.config.memory, self.config.threads)
             
             # Memory Configuration
             final_mem = self.config.memory
@@ -45,19 +142,59 @@ class DatabaseManager:
                 final_mem = self._get_optimal_ram_limit(final_mem)
                 
             self.conn.execute(f"PRAGMA memory_limit='{final_mem}'")
-            self.conn.execute(f"PRAGMA threads={self.config.threads}")
+            memory_limit = final_mem
+            
+            # Bulk-insert tuning: rows are append-only, so ordering can be relaxed,
+            # and a larger WAL threshold means fewer checkpoints during ingestion.
+            self.conn.execute("PRAGMA preserve_insertion_order=false")
+            self.conn.execute(f"PRAGMA checkpoint_threshold='{self.config.checkpoint_threshold}'")
+            if self.config.temp_directory:
+                self.conn.execute("SET temp_directory = ?", [self.config.temp_directory])
             
         else:
-            print("DB Config: Safe Mode engaged (Full integrity)")
+            logger.info("DB Config: Safe Mode engaged (Full integrity)")
+        
+        # Thread count applies to both modes and is set exactly once per connection
+        threads = self._adaptive_threads(memory_limit)
+        if threads > 0:
+            if threads < self.config.threads:
+                logger.info("DB: Threads capped to %d (requested %d) to fit the memory limit.", threads, self.config.threads)
+            self.conn.execute(f"PRAGMA threads={threads}")
             
         self._setup_schema()
     
-    def close(self):
-        """Closes the database connection safely."""
+    def close(self, flush: bool = True):
+        """
+        Closes the database connection safely.
+        With in-memory staging, the staged database is written to disk first, unless 'flush' is False (then it is discarded).
+        """
         if self.conn:
+            if self.staged_in_memory:
+                if flush:
+                    self._flush_memory_to_disk()
+                else:
+                    logger.warning("DB: In-memory changes discarded, %s was left unchanged.", self.db_path)
             self.conn.close()
             self.conn = None
 
+    def _flush_memory_to_disk(self):
+        """
+        Replaces the on-disk tables with the in-memory ones in one transaction:
+        a single sequential write of compressed row groups instead of many small commits.
+        """
+        logger.info("DB: Writing in-memory database to %s...", self.db_path)
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            for table in ("roms", "processed_files", "db_metadata"):
+                self.conn.execute(f"DROP TABLE IF EXISTS disk.{table}")
+            self.conn.execute("COPY FROM DATABASE memory TO disk")
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        finally:
+            self.conn.execute("DETACH disk")
+
     def _setup_schema(self, target_conn=None):
         """Creates tables. Can work on the main connection or a provided temporary one."""
         conn = target_conn or self.conn
@@ -93,131 +230,398 @@ class DatabaseManager:
         # Metadata
         conn.execute("CREATE TABLE IF NOT EXISTS db_metadata (key VARCHAR PRIMARY KEY, value VARCHAR)")
     
+    @contextmanager
+    def transaction(self, commit_every: int = 8):
+        """
+        Wraps a whole ingestion in one explicit transaction instead of auto-committing every batch.
+        Every 'commit_every' batches the transaction is committed and reopened, which bounds the
+        WAL/undo size, keeps already imported files resumable after a crash and limits what a failed
+        statement takes down with it (a COMMIT per batch costs ~20% on 100k-row batches, every 8th ~2%).
+        Rolls back on error.
+        Nested calls join the outer transaction; if a statement in them fails, the aborted outer
+        transaction is rolled back to its last commit and reopened (see _recover_aborted_transaction).
+        """
+        if self.in_transaction:
+            try:
+                yield self
+            except BaseException:
+                self._recover_aborted_transaction()
+                raise
+            return
+            
+        self.in_transaction = True
+        self.commit_every = commit_every
+        self.pending_batches = 0
+        self._reset_uncommitted()
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            yield self
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        else:
+            # A failed statement that the caller caught has aborted the transaction: COMMIT would
+            # silently discard it, so roll back (and report) instead
+            self._recover_aborted_transaction()
+            self.conn.execute("COMMIT")
+        finally:
+            self.in_transaction = False
+            self.commit_every = 0
+            self.pending_batches = 0
+            self._reset_uncommitted()
+    
+    def _reset_uncommitted(self):
+        self.uncommitted_rows = 0
+        self.uncommitted_files = set()
+    
+    def _recover_aborted_transaction(self) -> bool:
+        """
+        DuckDB aborts the whole open transaction when a statement in it fails: every later statement
+        fails too and the final COMMIT throws all of it away. Rolls back to the last commit and begins
+        a new transaction, so the ingestion can go on.
+        Files with rows in the rolled back batches are taken out completely (including rows of theirs that
+        were committed earlier and their processed_files marks), so a resumed run imports them again without
+        duplicates. They are logged and added to 'rolled_back_files' / 'rolled_back_rows'.
+        Returns True if the transaction had to be recovered.
+        """
+        if not self.in_transaction:
+            return False
+        try:
+            self.conn.execute("SELECT 1")
+            return False
+        except duckdb.TransactionException:
+            pass
+        
+        self.conn.execute("ROLLBACK")
+        self.conn.execute("BEGIN TRANSACTION")
+        lost_rows = self.uncommitted_rows
+        lost_files = sorted(self.uncommitted_files)
+        if lost_files:
+            lost_rows += self.conn.execute("DELETE FROM roms WHERE dat_filename IN (SELECT UNNEST(?))", (lost_files, )).fetchone()[0]
+            self.conn.execute("DELETE FROM processed_files WHERE filename IN (SELECT UNNEST(?))", (lost_files, ))
+        
+        logger.error("Transaction aborted by a failed statement: %d ROM rows of %d files were rolled back (resume to import them again): %s", 
+                     lost_rows, len(lost_files), ", ".join(lost_files))
+        self.rolled_back_rows += lost_rows
+        self.rolled_back_files.extend(lost_files)
+        self._reset_uncommitted()
+        self.pending_batches = 0
+        return True
+    
+    @contextmanager
+    def bulk_load(self, commit_every: int = 8):
+        """
+        Scope for a bulk import: insertion order is relaxed (DuckDB may then append batches
+        in parallel, without an order-preserving sink) and everything runs in transaction().
+        The previous preserve_insertion_order setting is restored afterwards.
+        """
+        previous = self.conn.execute("SELECT current_setting('preserve_insertion_order')").fetchone()[0]
+        self.conn.execute("SET preserve_insertion_order = false")
+        try:
+            with self.transaction(commit_every=commit_every):
+                yield self
+        finally:
+            self.conn.execute(f"SET preserve_insertion_order = {'true' if previous else 'false'}")
+
+    def _commit_checkpoint(self):
+        """Periodic COMMIT + BEGIN inside transaction(); no-op outside of it."""
+        if not self.commit_every:
+            return
+        
+        self.pending_batches += 1
+        if self.pending_batches >= self.commit_every:
+            self._recover_aborted_transaction()
+            self.conn.execute("COMMIT")
+            self.conn.execute("BEGIN TRANSACTION")
+            self.pending_batches = 0
+            self._reset_uncommitted()
+            
+    def drop_indexes(self):
+        """Drops the lookup indexes so bulk inserts don't pay for ART maintenance row by row."""
+        for name in ROM_INDEXES:
+            self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    def create_indexes(self):
+        """(Re)builds the lookup indexes on 'roms' (sha1, crc+size) in one pass over the loaded data."""
+        for name, columns in ROM_INDEXES.items():
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON roms ({columns})")
+
+    def cluster_by_hash(self):
+        """
+        Rewrites 'roms' ordered by sha1 so each row group covers a narrow hash range:
+        min/max zone maps then let hash lookups skip almost every row group.
+        Indexes are dropped with the old table; call create_indexes() afterwards.
+        """
+        with self.transaction(commit_every=0):
+            self.conn.execute("CREATE OR REPLACE TABLE roms_sorted AS SELECT * FROM roms ORDER BY sha1")
+            self.conn.execute("DROP TABLE roms")
+            self.conn.execute("ALTER TABLE roms_sorted RENAME TO roms")
+
     def get_metadata_value(self, key: str) -> Optional[str]:
-        """Fetches a value from the metadata table safely."""
+        """Fetches a value from the metadata table (None if the key or the table doesn't exist)."""
         try:
             result = self.conn.execute("SELECT value FROM db_metadata WHERE key=?", (key, )).fetchone()
             return result[0] if result else None
-        except:
+        except duckdb.CatalogException:
+            # Table missing (e.g. a foreign/older DB file); any other error is real and propagates
             return None
 
     def set_metadata_value(self, key: str, value: str):
-        """Sets or updates a metadata key."""
-        self.conn.execute("INSERT OR REPLACE INTO db_metadata VALUES (?, ?)", (key, value))
+        """Sets or updates a metadata key (single-statement atomic upsert)."""
+        self.conn.execute("""
+            INSERT INTO db_metadata VALUES (?, ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value
+        """, (key, value))
 
     def get_processed_files(self) -> set:
         """Returns a set of filenames that have already been imported."""
         try:
-            res = self.conn.execute("SELECT filename FROM processed_files").fetchall()
-            return {row[0] for row in res}
-        except:
+            # filename is the PRIMARY KEY (already unique): fetch one Arrow column instead of per-row tuples
+            table = self.conn.execute("SELECT filename FROM processed_files").fetch_arrow_table()
+            return set(table.column("filename").to_pylist())
+        except duckdb.CatalogException:
             return set()
 
+    def count_processed_files(self) -> int:
+        """Number of already imported files (a COUNT inside DuckDB, no filenames are fetched)."""
+        try:
+            return self.conn.execute("SELECT count(*) FROM processed_files").fetchone()[0]
+        except duckdb.CatalogException:
+            return 0
+
+    def filter_unprocessed(self, all_paths: List[str]) -> List[str]:
+        """
+        Returns the paths whose basename is not yet in processed_files (input order is kept).
+        The diff runs inside DuckDB as an anti-join over a registered Arrow table,
+        instead of materializing every processed filename into a Python set.
+        """
+        if not all_paths:
+            return []
+            
+        candidates = pa.table({
+            "idx": pa.array(range(len(all_paths)), type=pa.int64()),
+            "path": pa.array(all_paths, type=pa.string()),
+            "base": pa.array(list(map(os.path.basename, all_paths)), type=pa.string()),
+        })
+        self.conn.register("candidates", candidates)
+        try:
+            rows = self.conn.execute("""
+                SELECT c.path FROM candidates c
+                ANTI JOIN processed_files p ON c.base = p.filename
+                ORDER BY c.idx
+            """).fetchall()
+        finally:
+            self.conn.unregister("candidates")
+            
+        return [row[0] for row in rows]
+
     def wipe_database(self):
-        """Clears all data but keeps the file structure."""
+        """
+        Clears all data but keeps the file structure.
+        Tables are dropped and re-created in one transaction, which is a metadata-only
+        operation instead of a row-by-row DELETE pass over the whole database.
+        """
         try:
-            self.conn.execute("DELETE FROM roms")
-            self.conn.execute("DELETE FROM processed_files")
-            self.conn.execute("DELETE FROM db_metadata")
-            self.conn.execute("VACUUM")
+            self.conn.execute("BEGIN TRANSACTION")
+            self.conn.execute("DROP TABLE IF EXISTS roms")
+            self.conn.execute("DROP TABLE IF EXISTS processed_files")
+            self.conn.execute("DROP TABLE IF EXISTS db_metadata")
+            self._setup_schema()
+            self.conn.execute("COMMIT")
         except Exception as error:
-            print(f"Error wiping database: {error}")
+            self.conn.execute("ROLLBACK")
+            logger.error("Error wiping database: %s", error)
 
-    def insert_batch(self, buffer: List[Tuple]):
-        """Inserts a batch of ROMs and marks their files as processed."""
-        if not buffer:
-            return
-            
-        # Insert ROM data
-        self.conn.executemany("INSERT INTO roms VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", buffer)
-        # Mark files as processed
-        unique_files = {row[0] for row in buffer}
-        for filename in unique_files:
-            self.conn.execute("INSERT OR IGNORE INTO processed_files (filename) VALUES (?)", (filename, ))
+    def insert_batch(self, buffer: Union[pa.Table, RomColumns, List[Tuple]]):
+        """
+        Inserts a batch of ROMs and marks their files as processed.
+        The columnar buffer is converted to typed Arrow arrays and registered with DuckDB,
+        so the whole batch lands with a single zero-copy scan instead of per-row binds.
+        Arrow tables (from parse workers) are inserted as-is; row tuples (legacy callers)
+        are pivoted to columns first.
+        ROM rows and their processed_files entries always commit together.
+        """
+        if isinstance(buffer, pa.Table):
+            if buffer.num_rows == 0:
+                return
+            table = buffer
+            unique_files = pc.unique(table.column("filename")).to_pylist()
+        else:
+            if not buffer:
+                return
+            if not isinstance(buffer, RomColumns):
+                buffer = RomColumns.from_rows(buffer)
+            table = buffer.to_arrow()
+            unique_files = buffer.unique_filenames()
+        
+        with self.transaction(commit_every=0):
+            self._commit_checkpoint()
+            uncommitted = self.uncommitted_rows, set(self.uncommitted_files)
+            try:
+                # Insert ROM data
+                self._append_arrow(table)
+                
+                # Mark files as processed (one set-based statement, the list is bound as a single LIST parameter)
+                self.conn.execute("INSERT OR IGNORE INTO processed_files (filename) SELECT UNNEST(?)", (unique_files, ))
+            except Exception:
+                # The caller learns about this batch from the exception; it isn't collateral of the rollback
+                self.uncommitted_rows, self.uncommitted_files = uncommitted
+                raise
             
-    def export_to_parquet(self, parquet_path: str, threads: int = 1):
-    
-        if not os.path.exists(self.db_path):
-            print(f"  Database not found: {self.db_path}")
+    def insert_arrow(self, batch: Union[pa.Table, pa.RecordBatch]):
+        """
+        Appends an Arrow table/batch (ROM_ARROW_SCHEMA column order) to 'roms'.
+        This is the single hot insert path: DuckDB scans the Arrow buffers directly,
+        skipping the SQL binder per row (no executemany, no pandas-only appender).
+        Slices go through the relation API (from_arrow().insert_into()), so there is no SQL text
+        to parse and no temporary view to register/unregister per slice.
+        """
+        if batch.num_rows == 0:
             return
-
-        print(f"  Exporting database to Parquet: {parquet_path} (Threads: {threads})...")
+        
+        # Batch boundary: previous batches (and their processed_files rows) are complete
+        self._commit_checkpoint()
+        try:
+            self._append_arrow(batch)
+        except Exception:
+            self._recover_aborted_transaction()
+            raise
+    
+    def _append_arrow(self, batch: Union[pa.Table, pa.RecordBatch]):
+        """insert_arrow() without the commit checkpoint; a failed batch's own rows don't count as uncommitted."""
+        rows = self.uncommitted_rows
+        try:
+            # Zero-copy slices aligned to DuckDB's row-group size
+            for offset in range(0, batch.num_rows, BATCH_FLUSH_ROWS):
+                self.conn.from_arrow(batch.slice(offset, BATCH_FLUSH_ROWS)).insert_into("roms")
+                self.uncommitted_rows += min(BATCH_FLUSH_ROWS, batch.num_rows - offset)
+        except Exception:
+            self.uncommitted_rows = rows
+            raise
+        if self.in_transaction:
+            self.uncommitted_files.update(pc.unique(batch.column("filename")).to_pylist())
+            
+    def export_to_parquet(self, parquet_path: str, compression: str = "zstd", compression_level: int = 3,
+                          row_group_size: int = 122880, partition_by: Optional[str] = None):
+        """
+        Exports the roms table to Parquet over the open connection.
+        Rows are streamed out in row groups of 'row_group_size' (bounded write buffer, parallel reads later).
+        With 'partition_by', 'parquet_path' becomes a Hive-partitioned directory (e.g. platform=.../*.parquet).
+        """
+        codec = PARQUET_CODECS.get(compression.lower())
+        if codec is None:
+            raise ValueError(f"Unsupported Parquet compression: '{compression}'")
+        if partition_by and partition_by not in PARTITION_COLUMNS:
+            raise ValueError(f"Cannot partition by '{partition_by}'. Choose from: {', '.join(PARTITION_COLUMNS)}")
+        
+        # COPY options are validated above; only the path is user text and it is bound as a parameter.
+        options = ["FORMAT PARQUET", f"COMPRESSION '{codec}'", f"ROW_GROUP_SIZE {int(row_group_size)}"]
+        if codec == "ZSTD":
+            options.append(f"COMPRESSION_LEVEL {int(compression_level)}")
+        if partition_by:
+            options += [f"PARTITION_BY ({partition_by})", "OVERWRITE_OR_IGNORE"]
+        
+        logger.info("  Exporting database to Parquet: %s (Threads: %s, Codec: %s)...", parquet_path, self.config.threads, codec)
         start = time.time()
         
         try:
-            conn = duckdb.connect(self.db_path)
-            conn.execute(f"PRAGMA threads={threads}")
-            conn.execute(f"COPY roms TO '{parquet_path}' (FORMAT PARQUET, COMPRESSION 'SNAPPY')")
-            conn.close()
-            print(f"  Export completed in {time.time() - start:.2f}s")
+            # Path is bound as a parameter (safe for quotes/backslashes in file names)
+            self.conn.execute(f"COPY roms TO ? ({', '.join(options)})", (parquet_path, ))
+            logger.info("  Export completed in %.2fs", time.time() - start)
             
         except Exception as error:
-            print(f"  Export failed: {error}")
+            logger.error("  Export failed: %s", error)
 
-    def import_from_parquet(self, parquet_path: str, threads: int = 1):
-        
+    def import_from_parquet(self, parquet_path: str):
+        """Bulk loads a Parquet file into the roms table over the open connection."""
         if not os.path.exists(parquet_path):
-            print(f"  Parquet file not found: {parquet_path}")
+            logger.error("  Parquet file not found: %s", parquet_path)
             return
 
-        print(f"  Importing Parquet into database: {self.db_path} (Threads: {threads})...")
+        logger.info("  Importing Parquet into database: %s (Threads: %s)...", self.db_path, self.config.threads)
         start = time.time()
         
         try:
-            conn = duckdb.connect(self.db_path) 
-            self._setup_schema(target_conn=conn)
-            conn.execute(f"PRAGMA threads={threads}")   
-            # Read Parquet and insert into table
-            conn.execute(f"INSERT INTO roms SELECT * FROM read_parquet('{parquet_path}')")
+            # Append-only restore: row order is irrelevant, let the loader parallelize freely
+            # (bulk_load() restores the setting afterwards, and rolls back a failed load)
+            with self.bulk_load():
+                if os.path.isdir(parquet_path):
+                    # Partitioned export: the partition column lives in the directory names, so match columns by name
+                    pattern = os.path.join(parquet_path, "**", "*.parquet").replace('\\', '/')
+                    self.conn.execute("INSERT INTO roms BY NAME SELECT * FROM read_parquet(?, hive_partitioning=true)", (pattern, ))
+                else:
+                    # Bulk load path (COPY) instead of routing rows through INSERT ... SELECT
+                    self.conn.execute("COPY roms FROM ? (FORMAT PARQUET)", (parquet_path, ))
             
             # Statistics
-            count = conn.execute("SELECT count(*) FROM roms").fetchone()[0]
-            conn.close()
+            count = self.conn.execute("SELECT count(*) FROM roms").fetchone()[0]
             
-            print(f"  Import completed in {time.time() - start:.2f}s")
-            print(f"  Total Rows in DB: {count:,}")
+            logger.info("  Import completed in %.2fs", time.time() - start)
+            logger.info("  Total Rows in DB: %s", f"{count:,}")
             
         except Exception as error:
-            print(f"  Import failed: {error}")
+            logger.error("  Import failed: %s", error)
     
+    @staticmethod
+    def _scan_parquet_dir(folder_path: str) -> List[str]:
+        """
+        Single scandir pass over a chunk folder: returns the sorted .parquet file paths ('/' separated).
+        scandir raises FileNotFoundError for a missing folder, so no separate exists() check is needed.
+        """
+        with os.scandir(folder_path) as entries:
+            # Windows fix: When sending paths within SQL, it's always safer to use a '/'.
+            return sorted(entry.path.replace('\\', '/') for entry in entries
+                          if entry.name.endswith(".parquet") and entry.is_file())
+
     def import_from_parquet_folder(self, folder_path: str):
         """
         Bulk imports all .parquet files from a directory into the main table.
-        Uses DuckDB's 'read_parquet' with wildcard support for maximum speed.
+        The files are enumerated once and handed to 'read_parquet' as an explicit list,
+        so DuckDB knows every file upfront instead of globbing the folder again.
         """
-        if not os.path.exists(folder_path):
-             raise FileNotFoundError(f"Parquet folder not found: {folder_path}")
+        try:
+            files = self._scan_parquet_dir(folder_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Parquet folder not found: {folder_path}") from None
 
-        # Check the folder for the existence of the part files.
         # DuckDB may throw an error or perform an empty operation if there is an empty folder
-        if not any(f.endswith(".parquet") for f in os.listdir(folder_path)):
-            print("No .parquet files found in temp folder to import.")
+        if not files:
+            logger.warning("No .parquet files found in temp folder to import.")
             return
 
-        print(f"DuckDB: Bulk importing chunks from {folder_path}/*.parquet ...")
-        
-        # Windows fix: When sending paths within SQL, it's always safer to use a '/'.
-        safe_path = folder_path.replace('\\', '/')
+        logger.info("DuckDB: Bulk importing %d chunks from %s ...", len(files), folder_path)
         
         try:
-            # DuckDB's glob (*) capability ensures it to retrieve thousands of files 
-            # with a single SQL command without looping.
-            query = f"INSERT INTO roms SELECT * FROM read_parquet('{safe_path}/*.parquet', union_by_name=True);"
-            self.conn.execute(query)
+            # One SQL command for thousands of files, no Python loop. The file list is bound as a parameter.
+            inserted = self.conn.execute("INSERT INTO roms SELECT * FROM read_parquet(?, union_by_name=True, hive_partitioning=false)", 
+                                         (files, )).fetchone()[0]
+            self.uncommitted_rows += inserted
             
-            print("Bulk Import Success.")
+            logger.info("Bulk Import Success.")
             
         except Exception as error:
-            print(f"Bulk Import Error: {error}")
+            logger.error("Bulk Import Error: %s", error)
+            self._recover_aborted_transaction()
             raise error
     
-    def configure_threads(self, thread_count: int):
-        """Sets the PRAGMA threads for DuckDB."""
-        if thread_count > 0:
-            self.conn.execute(f"PRAGMA threads={thread_count}")
+    def _adaptive_threads(self, memory_limit: Optional[str]) -> int:
+        """
+        Caps the requested thread count by the memory limit applied to the connection (None: no limit set,
+        no cap): threads beyond what the limit can feed only spill to disk and slow the load down.
+        threads <= memory_limit / THREAD_MEMORY
+        """
+        requested = self.config.threads
+        if requested <= 1 or not memory_limit:
+            return requested
+        
+        memory_bytes = _parse_memory_size(memory_limit)
+        if not memory_bytes:
+            return requested
+        
+        return min(requested, max(1, memory_bytes // THREAD_MEMORY))
 
     def _get_optimal_ram_limit(self, limit_str):
-        """Calculates 75% of total RAM in GB, working on both Windows and Linux."""
+        """Calculates the requested percentage of total RAM in GB (75% for 'auto'), working on both Windows and Linux."""
         if limit_str == "auto":
             limit_str = "75%"
 
@@ -227,47 +631,16 @@ class DatabaseManager:
 
         try:
             percent = int(limit_str.replace("%", "")) / 100.0
-            total_ram_bytes = 0
-            
-            # for Windows
-            if platform.system() == "Windows":
-                kernel32 = ctypes.windll.kernel32
-                c_ulonglong = ctypes.c_ulonglong
-                
-                class MEMORYSTATUSEX(ctypes.Structure):
-                    _fields_ = [
-                        ('dwLength', ctypes.c_ulong),
-                        ('dwMemoryLoad', ctypes.c_ulong),
-                        ('ullTotalPhys', c_ulonglong),
-                        ('ullAvailPhys', c_ulonglong),
-                        ('ullTotalPageFile', c_ulonglong),
-                        ('ullAvailPageFile', c_ulonglong),
-                        ('ullTotalVirtual', c_ulonglong),
-                        ('ullAvailVirtual', c_ulonglong),
-                        ('ullAvailExtendedVirtual', c_ulonglong),
-                    ]
-                
-                mem_status = MEMORYSTATUSEX()
-                mem_status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
-                kernel32.GlobalMemoryStatusEx(ctypes.byref(mem_status))
-                total_ram_bytes = mem_status.ullTotalPhys
-
-            # for Linux / Mac 
-            else:
-                if "SC_PAGE_SIZE" in os.sysconf_names and "SC_PHYS_PAGES" in os.sysconf_names:
-                    total_ram_bytes = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+            total_ram_bytes = _get_total_ram_bytes()
             
             if total_ram_bytes <= 0:
                 return "4GB"
 
-            limit_gb = int((total_ram_bytes * 0.75) / (1024**3))
+            limit_gb = int((total_ram_bytes * percent) / (1024**3))
             limit_gb = max(1, limit_gb)
             
             return f"{limit_gb}GB"
 
         except Exception as error:
-            print(f"RAM detection failed ({error}), defaulting to 2GB.")
+            logger.warning("RAM detection failed (%s), defaulting to 2GB.", error)
             return "2GB"
-            
-    def get_appender(self, table_name):
-        return self.conn.cursor().appender(table_name)
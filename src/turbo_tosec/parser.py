@@ -1,10 +1,21 @@
 import os
 from typing import Dict, List, Tuple, Iterator, Optional
+from dataclasses import dataclass, field
 import re
 import xml.etree.ElementTree as ET
 import logging
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from bisect import bisect_left
+
+# Optional: lxml's C iterparse (tag filtering + sibling cleanup in libxml2). Falls back to ElementTree.
+try:
+    from lxml import etree as LET
+except ImportError:
+    LET = None
 
 # GLOBAL CONSTANTS (Module Level)
 # Compile patterns ONCE at import time.
@@ -14,15 +25,188 @@ import pyarrow.parquet as pq
 CMP_HEADER_PATTERN = re.compile(r'clrmamepro\s*\(', re.IGNORECASE)
 
 # Cmp parsing patterns
-GAME_PATTERN = re.compile(r'game\s*\(', re.IGNORECASE)
-NAME_PAT = re.compile(r'name\s+"(.*?)"', re.IGNORECASE)
-DESC_PAT = re.compile(r'description\s+"(.*?)"', re.IGNORECASE)
-ROM_PAT = re.compile(r'rom\s*\(\s*(.*?)\s*\)', re.DOTALL | re.IGNORECASE)
-ROM_NAME_PAT = re.compile(r'name\s+"(.*?)"', re.IGNORECASE)
-SIZE_PAT = re.compile(r'size\s+(\d+)', re.IGNORECASE)
-CRC_PAT = re.compile(r'crc\s+([0-9a-fA-F]+)', re.IGNORECASE)
-MD5_PAT = re.compile(r'md5\s+([0-9a-fA-F]+)', re.IGNORECASE)
-SHA1_PAT = re.compile(r'sha1\s+([0-9a-fA-F]+)', re.IGNORECASE)
+# (bytes patterns: InMemoryParser scans a lowercased copy of the file, so no IGNORECASE is needed;
+#  captured values are sliced from the original bytes at the same offsets to keep their case)
+GAME_PATTERN = re.compile(rb'game\s*\(')
+# First run of digits in a free-form size string ("10 mb", "1kb")
+DIGITS_PAT = re.compile(r'(\d+)')
+NAME_PAT = re.compile(rb'name\s+"(.*?)"')
+DESC_PAT = re.compile(rb'description\s+"(.*?)"')
+# Start of a 'rom ( ... )' entry; its end is found by the same paren balance scan as game blocks,
+# so quoted names containing ')' (e.g. "Game (1986)(Publisher).adf") stay inside the entry.
+ROM_START_PAT = re.compile(rb'rom\s*\(')
+# Bytes twin of ROM_FIELDS_PAT for the lowercased scan
+ROM_FIELDS_BYTES_PAT = re.compile(
+    rb'name\s+"(?P<name>[^"]*)"|size\s+(?P<size>\d+)|crc\s+(?P<crc>[0-9a-f]+)|md5\s+(?P<md5>[0-9a-f]+)|sha1\s+(?P<sha1>[0-9a-f]+)')
+# Line classifier for the streaming CMP parser (one anchored match instead of strip() + startswith chains).
+# lastindex tells the kind: 1 = block start, 2 = name, 3 = description, 4 = rom, 5 = block end
+CMP_LINE_PAT = re.compile(r'\s*(?:(game \(|resource \()|(name ")|(description ")|(rom \()|(\))\s*$)')
+CMP_START, CMP_NAME, CMP_DESC, CMP_ROM, CMP_END = 1, 2, 3, 4, 5
+# All fields of a 'rom ( ... )' entry in one pass (quoted names are consumed whole, so keywords inside them don't match)
+ROM_FIELDS_PAT = re.compile(
+    r'name\s+"(?P<name>[^"]*)"|size\s+(?P<size>\d+)|crc\s+(?P<crc>[0-9a-f]+)|md5\s+(?P<md5>[0-9a-f]+)|sha1\s+(?P<sha1>[0-9a-f]+)',
+    re.IGNORECASE)
+
+# Read buffer for streamed (line by line) DAT reads: one large read() per MB instead of one per 8 KB,
+# which matters on network shares. iterparse keeps its own chunked reads (lxml is faster given the path).
+READ_BUFFER_SIZE = 1 << 20
+
+# Columns that repeat a handful of values per DAT file: stored as dictionary indices
+# (one copy of each string per batch) instead of one string per row.
+DICT_STRING = pa.dictionary(pa.int32(), pa.string())
+
+# Parquet dictionary encoding only where values repeat; unique hashes/names would just fill
+# a dictionary page, overflow it and fall back to plain encoding (wasted CPU, bigger files).
+PARQUET_DICTIONARY_COLUMNS = ['filename', 'platform', 'category', 'status', 'system', 'release_year']
+
+# Staging files: zstd level 1 writes about as fast as snappy but far smaller (repetitive DAT text),
+# and 128k-row groups give DuckDB several row groups per file to scan in parallel.
+PARQUET_STAGING_CODEC = 'zstd'
+PARQUET_STAGING_LEVEL = 1
+PARQUET_ROW_GROUP_SIZE = 131072
+
+# Arrow schema of the 'roms' table (column order must match the DB schema)
+ROM_ARROW_SCHEMA = pa.schema([
+    ('filename', DICT_STRING), ('platform', DICT_STRING), ('category', DICT_STRING),
+    ('game_name', pa.string()), ('title', pa.string()), ('release_year', pa.int32()),
+    ('description', pa.string()), ('rom_name', pa.string()), ('size', pa.int64()),
+    ('crc', pa.string()), ('md5', pa.string()), ('sha1', pa.string()), 
+    ('status', DICT_STRING), ('system', DICT_STRING)
+])
+
+@dataclass
+class RomColumns:
+    """
+    Struct-of-Arrays buffer for ROM rows: one list per 'roms' column.
+    Keeps batches columnar all the way to Arrow/DuckDB instead of holding one tuple per ROM.
+    Columns can be pre-sized (with_capacity) and are written by index, so a reused batch
+    buffer doesn't re-grow its lists on every flush; 'length' tracks the filled rows.
+    Row access (rows[i]) is still supported for inspection and tests.
+    """
+    filename: list = field(default_factory=list)
+    platform: list = field(default_factory=list)
+    category: list = field(default_factory=list)
+    game_name: list = field(default_factory=list)
+    title: list = field(default_factory=list)
+    release_year: list = field(default_factory=list)
+    description: list = field(default_factory=list)
+    rom_name: list = field(default_factory=list)
+    size: list = field(default_factory=list)
+    crc: list = field(default_factory=list)
+    md5: list = field(default_factory=list)
+    sha1: list = field(default_factory=list)
+    status: list = field(default_factory=list)
+    system: list = field(default_factory=list)
+    length: int = 0
+
+    @classmethod
+    def with_capacity(cls, capacity: int) -> "RomColumns":
+        """Creates an empty buffer with every column pre-sized to 'capacity' rows."""
+        buffer = cls()
+        buffer.reserve(capacity)
+        return buffer
+
+    @classmethod
+    def from_rows(cls, rows: List[Tuple]) -> "RomColumns":
+        """Pivots legacy row tuples (AoS) into columns (SoA)."""
+        buffer = cls()
+        for column, values in zip(buffer.columns(), zip(*rows)):
+            column.extend(values)
+        buffer.length = len(rows)
+        return buffer
+
+    @property
+    def capacity(self) -> int:
+        return len(self.filename)
+
+    def columns(self) -> List[list]:
+        """Returns the column storage lists in schema order (may include unused capacity)."""
+        return [getattr(self, name) for name in ROM_ARROW_SCHEMA.names]
+
+    def reserve(self, capacity: int):
+        """Grows every column to at least 'capacity' slots in one step."""
+        missing = capacity - self.capacity
+        if missing > 0:
+            padding = [None] * missing
+            for column in self.columns():
+                column.extend(padding)
+
+    def append(self, filename, platform, category, game_name, title, release_year, description,
+               rom_name, size, crc, md5, sha1, status, system):
+        i = self.length
+        if i >= self.capacity:
+            # Amortized growth: double the storage instead of growing all columns per row
+            self.reserve(max(1024, 2 * self.capacity))
+            
+        self.filename[i] = filename
+        self.platform[i] = platform
+        self.category[i] = category
+        self.game_name[i] = game_name
+        self.title[i] = title
+        self.release_year[i] = release_year
+        self.description[i] = description
+        self.rom_name[i] = rom_name
+        self.size[i] = size
+        self.crc[i] = crc
+        self.md5[i] = md5
+        self.sha1[i] = sha1
+        self.status[i] = status
+        self.system[i] = system
+        self.length = i + 1
+
+    def extend(self, other: "RomColumns"):
+        """Appends all rows of another buffer, column by column (slice writes into the free slots)."""
+        n = len(other)
+        if not n:
+            return
+        
+        start, end = self.length, self.length + n
+        self.reserve(end)
+        for column, values in zip(self.columns(), other.columns()):
+            column[start:end] = values if len(values) == n else values[:n]
+        self.length = end
+
+    def compact(self) -> "RomColumns":
+        """Drops unused capacity (e.g. before pickling a worker result back to the parent)."""
+        for column in self.columns():
+            del column[self.length:]
+        return self
+
+    def unique_filenames(self) -> List[str]:
+        """Distinct DAT filenames of the filled rows."""
+        return list(set(self.filename[:self.length]))
+
+    def clear(self):
+        """Resets the row count; the storage is kept so the buffer can be reused across batches."""
+        self.length = 0
+
+    def truncate(self, length: int):
+        """Drops the rows after 'length' (e.g. the partial rows of a file that failed to parse)."""
+        self.length = min(self.length, length)
+
+    def to_arrow(self) -> pa.Table:
+        """Converts each column (filled rows only) to a typed Arrow array once per flush."""
+        n = self.length
+        arrays = []
+        for column, f in zip(self.columns(), ROM_ARROW_SCHEMA):
+            values = column if len(column) == n else column[:n]
+            # Per-DAT constants (filename, platform, ...): one dictionary entry + repeated index 0,
+            # no hashing of n strings. list.count is a C loop that short-circuits on identical objects.
+            if f.type == DICT_STRING and n and values[0] is not None and values.count(values[0]) == n:
+                arrays.append(pa.DictionaryArray.from_arrays(pa.repeat(pa.scalar(0, pa.int32()), n), pa.array([values[0]])))
+            else:
+                arrays.append(pa.array(values, type=f.type))
+        return pa.Table.from_arrays(arrays, schema=ROM_ARROW_SCHEMA)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int) -> Tuple:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("RomColumns index out of range")
+        return tuple(column[index] for column in self.columns())
 
 def _detect_file_format(file_path: str) -> str:
     """
@@ -65,13 +249,18 @@ def parse_game_info(game_name) -> Tuple[str, int]:
     
     # 1. Title: Take everything up to the first '(' character)
     # If there are no parentheses, take the entire name.
-    title_match = re.match(r'^(.*?)(\s*\(|$)', game_name)
-    title = title_match.group(1).strip() if title_match else game_name.strip()
+    # (Plain str.find/slicing: this runs once per game, a regex here is pure overhead)
+    paren = game_name.find('(')
+    title = game_name[:paren].strip() if paren >= 0 else game_name.strip()
     
     # 2. Year: Capture the format (19xx) or (20xx)
     # Usually the first parenthesis, but look for 4 digits to be sure.
-    year_match = re.search(r'\((\d{4})\)', game_name)
-    release_year = int(year_match.group(1)) if year_match else None
+    release_year = None
+    while 0 <= paren <= len(game_name) - 6:
+        if game_name[paren + 5] == ')' and game_name[paren + 1:paren + 5].isdecimal():
+            release_year = int(game_name[paren + 1:paren + 5])
+            break
+        paren = game_name.find('(', paren + 1)
     
     return title, release_year
 
@@ -89,6 +278,10 @@ def _try_parse_size(raw_value: str) -> int:
     """
     if not raw_value:
         return 0
+    
+    # Fast path: almost every DAT stores a plain decimal size
+    if type(raw_value) is str and raw_value.isdecimal():
+        return int(raw_value)
         
     s = str(raw_value).strip().lower()
     
@@ -112,7 +305,7 @@ def _try_parse_size(raw_value: str) -> int:
         multiplier = 1024 ** 3
 
     # 3. Extract digits
-    match = re.search(r"(\d+)", s)
+    match = DIGITS_PAT.search(s)
     if match:
         try:
             val = int(match.group(1))
@@ -123,8 +316,121 @@ def _try_parse_size(raw_value: str) -> int:
     # If no match.
     raise ValueError(f"Unknown/Unparsable size format: '{raw_value}'")
 
-def _get_common_info(file_path: str) -> Tuple[str, str, str]:
+def _iter_game_elements(file_path: str) -> Iterator:
+    """
+    Streams the <game>/<machine> elements of an XML DAT file.
+    With lxml the tag filter runs in C and already processed siblings are deleted,
+    so peak memory stays at one game element instead of growing with the file.
+    The caller must finish with an element before advancing the iterator.
+    """
+    if LET is not None:
+        # DATs are third-party input: no entity expansion, no network access, libxml2's default size limits
+        for _, elem in LET.iterparse(file_path, events=("end",), tag=("game", "machine"), 
+                                     resolve_entities=False, no_network=True):
+            yield elem
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        return
+
+    for _, elem in ET.iterparse(file_path, events=("end",)):
+        if elem.tag in ('game', 'machine'):
+            yield elem
+            elem.clear()
+
+def _find_block_end(data, pos: int, endpos: int = -1) -> int:
+    """
+    Paren balance scan for CMP blocks: 'pos' is just past an opening '('.
+    Returns the index of the matching ')' or -1 if the block isn't closed (before 'endpos').
+    Jumps from parenthesis to parenthesis with C-level find() instead of stepping through every character;
+    an opening paren only matters if it comes before the next closing one, so that search is bounded.
+    """
+    if endpos < 0:
+        endpos = len(data)
+    balance = 1
+    while True:
+        close_idx = data.find(b')', pos, endpos)
+        if close_idx == -1:
+            return -1
+        open_idx = data.find(b'(', pos, close_idx)
+        if open_idx != -1:
+            balance += 1
+            pos = open_idx + 1
+        else:
+            balance -= 1
+            if not balance:
+                return close_idx
+            pos = close_idx + 1
+
+def _paren_pairs(data: bytes) -> Optional[Tuple[memoryview, memoryview]]:
+    """
+    Matches every '(' of a CMP file with its ')' in one vectorized pass (pyarrow compute kernels
+    over a zero-copy uint8 view), instead of a Python-level balance scan per block.
+    Paren events are tagged with their depth (opens: depth after, closes: depth before); a stable sort
+    by that tag puts each '(' right before its matching ')'.
+    Returns (opens, closes): the '(' positions in ascending order and the matching ')' of each, as uint64
+    views of Arrow buffers (8 bytes per paren, no Python int per paren); look up with _matching_paren().
+    None if the parentheses aren't balanced (callers fall back to _find_block_end).
+    """
+    data_view = pa.Array.from_buffers(pa.uint8(), len(data), [None, pa.py_buffer(data)])
+    # '(' = 0x28 and ')' = 0x29 differ only in the lowest bit
+    positions = pc.indices_nonzero(pc.equal(pc.bit_wise_and(data_view, 0xFE), 0x28))
+    if len(positions) == 0:
+        return _uint64_view(positions), _uint64_view(positions)
+    
+    is_close = pc.subtract(pc.cast(pc.take(data_view, positions), pa.int32()), 0x28)  # 0 = '(', 1 = ')'
+    depth = pc.cumulative_sum(pc.subtract(1, pc.multiply(is_close, 2)))
+    if pc.min(depth).as_py() < 0 or depth[-1].as_py() != 0:
+        return None
     
+    paired = pa.FixedSizeListArray.from_arrays(pc.take(positions, pc.array_sort_indices(pc.add(depth, is_close))), 2)
+    opens, closes = pc.list_element(paired, 0), pc.list_element(paired, 1)
+    by_open = pc.array_sort_indices(opens)
+    return _uint64_view(pc.take(opens, by_open)), _uint64_view(pc.take(closes, by_open))
+
+def _uint64_view(array: pa.Array) -> memoryview:
+    return memoryview(array.buffers()[1]).cast('Q')[array.offset:array.offset + len(array)]
+
+def _matching_paren(pairs: Tuple[memoryview, memoryview], open_pos: int) -> int:
+    """Position of the ')' closing the '(' at 'open_pos' (binary search in _paren_pairs' result), -1 if none."""
+    opens, closes = pairs
+    index = bisect_left(opens, open_pos)
+    if index < len(opens) and opens[index] == open_pos:
+        return closes[index]
+    return -1
+
+def _scan_rom_fields(rom_data: str) -> Dict[str, str]:
+    """Collects name/size/crc/md5/sha1 of a CMP rom entry with a single regex scan (first occurrence wins)."""
+    fields = {}
+    for match in ROM_FIELDS_PAT.finditer(rom_data):
+        key = match.lastgroup
+        if key not in fields:
+            fields[key] = match.group(key)
+    return fields
+
+def _split_game_children(game) -> Tuple[Optional[str], list]:
+    """
+    One pass over a <game> element's children: returns (description text, rom elements).
+    Replaces find('description') + findall('rom'), which walk the children twice through the path engine.
+    """
+    description = ""
+    has_description = False
+    roms = []
+    for child in game:
+        tag = child.tag
+        if tag == 'rom':
+            roms.append(child)
+        elif tag == 'description' and not has_description:
+            description = child.text
+            has_description = True
+    return description, roms
+
+@lru_cache(maxsize=1024)
+def _get_common_info(file_path: str) -> Tuple[str, str, str, str]:
+    """
+    Per-file metadata derived from the path: (dat_filename, platform, category, system_name).
+    Shared by every parser/mode so the naming rules can't drift; memoized for retries and re-parses.
+    """
     dat_filename = os.path.basename(file_path)
     try:
         system_name = os.path.basename(os.path.dirname(file_path))
@@ -152,114 +458,126 @@ class InMemoryParser:
     def __init__(self):
         pass
 
-    def parse(self, file_path: str) -> List[Tuple]:
-        """Auto-detects format and parses the file."""
-        fmt = _detect_file_format(file_path)
+    def parse(self, file_path: str, fmt: Optional[str] = None) -> RomColumns:
+        """Auto-detects format (unless the caller already knows it: 'xml'/'cmp') and parses the file."""
+        fmt = fmt or _detect_file_format(file_path)
         if fmt == 'cmp':
             return self._parse_cmp(file_path)
         elif fmt == 'xml':
             return self._parse_xml(file_path)
 
-    def _parse_xml(self, file_path: str) -> List[Tuple]:
+    def _parse_xml(self, file_path: str) -> RomColumns:
         
-        rows = []
+        rows = RomColumns()
         dat_filename, platform, category, system_name = _get_common_info(file_path)
         
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            
-            for game in root.findall('game'):
+            # Streamed (one game element alive at a time) instead of building the whole tree with ET.parse
+            for game in _iter_game_elements(file_path):
                 game_name = game.get('name')
                 title, release_year = parse_game_info(game_name)
-                desc_node = game.find('description')
-                description = desc_node.text if desc_node is not None else ""
+                description, roms = _split_game_children(game)
                 
-                for rom in game.findall('rom'):
-                    rows.append((
+                for rom in roms:
+                    rows.append(
                         dat_filename, platform, category, game_name, title, release_year,
-                        description, rom.get('name'), rom.get('size'), rom.get('crc'), 
+                        description, rom.get('name'), _try_parse_size(rom.get('size')), rom.get('crc'), 
                         rom.get('md5'), rom.get('sha1'), rom.get('status', 'good'), 
                         system_name
-                    ))
+                    )
                     
         except Exception as error:
             logging.error(f"FAILED (XML): {file_path} -> {error}")
+            # All-or-nothing like the old full-tree parse: no partial rows from a broken file
+            return RomColumns()
             
         return rows
 
-    def _parse_cmp(self, file_path: str) -> List[Tuple]:
+    def _parse_cmp(self, file_path: str) -> RomColumns:
         
-        rows = []
+        rows = RomColumns()
         dat_filename, platform, category, system_name = _get_common_info(file_path)
 
+        # One read of the raw bytes: the regexes scan bytes (no decoded str copy of the whole file);
+        # only the captured groups are decoded.
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            with open(file_path, 'rb') as f:
                 content = f.read()
                 
         except Exception as error:
             logging.error(f"FAILED (Read CMP): {file_path} -> {error}")
-            return []
+            return rows
 
-        # --- CMP Parsing Logic (Bracket Counter) ---
-        game_blocks = []
-        iterator = GAME_PATTERN.finditer(content)
+        if content:
+            self._parse_cmp_blocks(content, rows, dat_filename, platform, category, system_name)
+            
+        return rows
+
+    @staticmethod
+    def _parse_cmp_blocks(content, rows: RomColumns, dat_filename: str, platform: str, category: str, system_name: str):
+        
+        # Keywords are matched on a lowercased copy (bytes.lower() is ASCII-only, so offsets line up
+        # and it matches exactly what IGNORECASE would); values are taken from the original bytes.
+        lowered = content.lower()
+        # Block ends for every '(' at once; only files with unbalanced parens take the per-block scan
+        pairs = _paren_pairs(lowered)
         
-        for match in iterator:
+        # --- CMP Parsing Logic (Bracket Counter) ---
+        for match in GAME_PATTERN.finditer(lowered):
             start_idx = match.end()
-            current_idx = start_idx
-            balance = 1
+            if pairs is not None:
+                end_idx = _matching_paren(pairs, start_idx - 1)
+            else:
+                end_idx = _find_block_end(lowered, start_idx)
+            if end_idx == -1:
+                continue
+            # Block = [start_idx, end_idx); searched in place via pos/endpos instead of slicing a copy
             
-            while balance > 0 and current_idx < len(content):
-                char = content[current_idx]
-                if char == '(': balance += 1
-                elif char == ')': balance -= 1
-                current_idx += 1
-                
-            if balance == 0:
-                game_blocks.append(content[start_idx : current_idx - 1])
-
-        for block in game_blocks:
-            g_name_match = NAME_PAT.search(block)
-            g_desc_match = DESC_PAT.search(block)
+            g_name_match = NAME_PAT.search(lowered, start_idx, end_idx)
+            g_desc_match = DESC_PAT.search(lowered, start_idx, end_idx)
             
-            game_name = g_name_match.group(1) if g_name_match else "Unknown"
+            game_name = content[g_name_match.start(1):g_name_match.end(1)].decode('utf-8', 'replace') if g_name_match else "Unknown"
             title, release_year = parse_game_info(game_name)
-            description = g_desc_match.group(1) if g_desc_match else ""
-
-            for rom_match in ROM_PAT.finditer(block):
-                rom_data = rom_match.group(1)
-                r_name = ROM_NAME_PAT.search(rom_data)
+            description = content[g_desc_match.start(1):g_desc_match.end(1)].decode('utf-8', 'replace') if g_desc_match else ""
+
+            rom_end = start_idx
+            for rom_match in ROM_START_PAT.finditer(lowered, start_idx, end_idx):
+                # 'rom (' inside the previous entry (e.g. a quoted name "From (Disk 1)") isn't a new entry
+                if rom_match.start() < rom_end:
+                    continue
+                rom_start = rom_match.end()
+                if pairs is not None:
+                    rom_end = _matching_paren(pairs, rom_start - 1)
+                else:
+                    rom_end = _find_block_end(lowered, rom_start, end_idx)
+                if rom_end == -1:
+                    break
+                # First occurrence of each field wins (same as _scan_rom_fields)
+                fields = {}
+                for field_match in ROM_FIELDS_BYTES_PAT.finditer(lowered, rom_start, rom_end):
+                    key = field_match.lastgroup
+                    if key not in fields:
+                        fields[key] = content[field_match.start(key):field_match.end(key)].decode('utf-8', 'replace')
                 
-                if r_name:
-                    r_size = SIZE_PAT.search(rom_data)
-                    r_crc = CRC_PAT.search(rom_data)
-                    r_md5 = MD5_PAT.search(rom_data)
-                    r_sha1 = SHA1_PAT.search(rom_data)
-
-                    rows.append((dat_filename, platform, category, game_name, 
-                                 title, release_year, description,
-                                r_name.group(1),
-                                int(r_size.group(1)) if r_size else 0,
-                                r_crc.group(1) if r_crc else "",
-                                r_md5.group(1) if r_md5 else "",
-                                r_sha1.group(1) if r_sha1 else "",
+                if 'name' in fields:
+                    size = fields.get('size')
+
+                    rows.append(dat_filename, platform, category, game_name, 
+                                title, release_year, description,
+                                fields['name'],
+                                int(size) if size else 0,
+                                fields.get('crc', ""),
+                                fields.get('md5', ""),
+                                fields.get('sha1', ""),
                                 "good",
                                 system_name
-                    ))
-        return rows
+                    )
 
 class TurboParser:
     """
     Handles parsing of TOSEC DAT files in both XML and legacy CMP formats.
     """
-    ARROW_SCHEMA = pa.schema([
-        ('filename', pa.string()), ('platform', pa.string()), ('category', pa.string()),
-        ('game_name', pa.string()), ('title', pa.string()), ('release_year', pa.int32()),
-        ('description', pa.string()), ('rom_name', pa.string()), ('size', pa.int64()),
-        ('crc', pa.string()), ('md5', pa.string()), ('sha1', pa.string()), 
-        ('status', pa.string()), ('system', pa.string())
-    ])
+    ARROW_SCHEMA = ROM_ARROW_SCHEMA
     
     def __init__(self):
         pass
@@ -269,57 +587,39 @@ class TurboParser:
             It  performs XML parsing (extraction).
             It uses memory-safe stream processing (iterparse).
             """
-            # Metadata Çıkarımı (Diğer yazılımcının mantığını koruduk)
-            dat_filename = os.path.basename(file_path)
-            try:
-                system_name = os.path.basename(os.path.dirname(file_path))
-            except:
-                system_name = "Unknown"
-            
-            clean_name = dat_filename.rsplit('.', 1)[0]
-            if "(TOSEC" in clean_name:
-                clean_name = clean_name.split("(TOSEC")[0].strip()
-            parts = clean_name.split(' - ', 1)
-            
-            platform = parts[0].strip()
-            category = parts[1].strip() if len(parts) > 1 else "Standard"
+            # Metadata Çıkarımı (same per-file logic as the other parsers, computed once per file)
+            dat_filename, platform, category, system_name = _get_common_info(file_path)
 
             # XML Stream İşlemi
             try:
-                context = ET.iterparse(file_path, events=("end",))
-                
-                for event, elem in context:
-                    if elem.tag in ('game', 'machine'):
-                        game_name = elem.get('name')
-                        # Parse game info fonksiyonunun var olduğunu varsayıyoruz
-                        title, release_year = parse_game_info(game_name) 
-                        
-                        desc_node = elem.find('description')
-                        description = desc_node.text if desc_node is not None else ""
-                        
-                        for rom in elem.findall('rom'):
-                            # Boyut parse etme güvenliği
-                            final_size = _try_parse_size(rom.get('size'))
-                            
-                            yield (
-                                dat_filename,
-                                platform,
-                                category,
-                                game_name,
-                                title,
-                                release_year,
-                                description,
-                                rom.get('name'),
-                                final_size,
-                                rom.get('crc'),
-                                rom.get('md5'),
-                                rom.get('sha1'),
-                                rom.get('status', 'good'),
-                                system_name
-                            )
+                # Game elements are cleared (RAM) by the iterator once we move on
+                for elem in _iter_game_elements(file_path):
+                    game_name = elem.get('name')
+                    # Parse game info fonksiyonunun var olduğunu varsayıyoruz
+                    title, release_year = parse_game_info(game_name) 
+                    
+                    description, roms = _split_game_children(elem)
+                    
+                    for rom in roms:
+                        # Boyut parse etme güvenliği
+                        final_size = _try_parse_size(rom.get('size'))
                         
-                        # Clear RAM
-                        elem.clear()
+                        yield (
+                            dat_filename,
+                            platform,
+                            category,
+                            game_name,
+                            title,
+                            release_year,
+                            description,
+                            rom.get('name'),
+                            final_size,
+                            rom.get('crc'),
+                            rom.get('md5'),
+                            rom.get('sha1'),
+                            rom.get('status', 'good'),
+                            system_name
+                        )
                         
             except Exception as error:
                 logging.error(f"Failed (XML Stream): {file_path} -> {error}")
@@ -336,62 +636,56 @@ class TurboParser:
         in_game_block = False
 
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            with open(file_path, 'r', buffering=READ_BUFFER_SIZE, encoding='utf-8', errors='replace') as f:
                 for line in f:
-                    line = line.strip()
-                    if not line: 
+                    # Blank and unknown lines don't match; leading/trailing whitespace needs no strip()
+                    line_match = CMP_LINE_PAT.match(line)
+                    if line_match is None: 
                         continue
-
-                    game_blocks = []
+                    kind = line_match.lastindex
 
                     # Start of block
-                    if line.startswith("game (") or line.startswith("resource ("):
+                    if kind == CMP_START:
                         in_game_block = True
-                        current_game_info = {'name': 'Unknown', 'description': ''}
+                        current_game_info = {'name': 'Unknown', 'description': '', 'title': 'Unknown', 'year': None}
                         continue
                     
                     # End of block
-                    if line == ")":
+                    if kind == CMP_END:
                         in_game_block = False
                         continue
 
                     if in_game_block:
                         # 1. Parse game data
-                        if line.startswith('name "'):
+                        if kind == CMP_NAME:
                             current_game_info['name'] = line.split('"')[1]
-                        elif line.startswith('description "'):
+                            # Parse Game Details once per game, not once per ROM
+                            current_game_info['title'], current_game_info['year'] = parse_game_info(current_game_info['name'])
+                        elif kind == CMP_DESC:
                             current_game_info['description'] = line.split('"')[1]
 
                         # 2. Parse ROM line and yield
-                        if line.startswith("rom ("):
-                            r_name_match = ROM_NAME_PAT.search(line)
-                            if not r_name_match: 
+                        elif kind == CMP_ROM:
+                            # This line is good for regex (one pass for all fields).
+                            fields = _scan_rom_fields(line)
+                            if 'name' not in fields: 
                                 continue
 
-                            r_name = r_name_match.group(1)
-                            
-                            # This line is good for regex.
-                            r_size = SIZE_PAT.search(line)
-                            r_crc = CRC_PAT.search(line)
-                            r_md5 = MD5_PAT.search(line)
-                            r_sha1 = SHA1_PAT.search(line)
-                            
-                            # Parse Game Details
-                            title, release_year = parse_game_info(current_game_info['name'])
+                            size = fields.get('size')
 
                             yield (
                                 dat_filename, 
                                 platform, 
                                 category, 
                                 current_game_info['name'],
-                                title, 
-                                release_year, 
+                                current_game_info['title'], 
+                                current_game_info['year'], 
                                 current_game_info['description'],
-                                r_name,
-                                int(r_size.group(1)) if r_size else 0,
-                                r_crc.group(1) if r_crc else "",
-                                r_md5.group(1) if r_md5 else "",
-                                r_sha1.group(1) if r_sha1 else "",
+                                fields['name'],
+                                int(size) if size else 0,
+                                fields.get('crc', ""),
+                                fields.get('md5', ""),
+                                fields.get('sha1', ""),
                                 "good",
                                 system_name
                             )
@@ -401,24 +695,23 @@ class TurboParser:
             raise error
 
     @staticmethod
-    def _write_chunk_arrow(data: List[Dict], output_dir: str, original_filename: str, index: int, schema: pa.Schema):
-        """Writes a list of dicts to Parquet using pure PyArrow."""
-        if not data:
-            return
-
+    def _chunk_path(output_dir: str, original_filename: str) -> str:
+        """Staging file of a DAT (or of a group of small DATs): row groups of up to PARQUET_ROW_GROUP_SIZE rows."""
         safe_name = "".join(x for x in original_filename if x.isalnum() or x in "._-")
-        output_path = os.path.join(output_dir, f"{safe_name}_part_{index}.parquet")
-        
-        # 1. List of Dicts -> PyArrow Table
-        table = pa.Table.from_pylist(data, schema=schema)
-        # 2. Write to Disk
-        pq.write_table(table, output_path, compression='snappy')
+        return os.path.join(output_dir, f"{safe_name}.parquet")
+    
+    @classmethod
+    def _open_chunk_writer(cls, output_path: str) -> pq.ParquetWriter:
+        return pq.ParquetWriter(output_path, cls.ARROW_SCHEMA, compression=PARQUET_STAGING_CODEC, 
+                                compression_level=PARQUET_STAGING_LEVEL, use_dictionary=PARQUET_DICTIONARY_COLUMNS, 
+                                write_statistics=True)
     
-    def parse(self, file_path: str) -> Iterator[Tuple]:
+    def parse(self, file_path: str, fmt: Optional[str] = None) -> Iterator[Tuple]:
         """
         Polyglot Parser: Detects the dat format and streams the data from the correct parser.
+        A format detected earlier ('xml'/'cmp') can be passed in to skip re-reading the file header.
         """
-        fmt = _detect_file_format(file_path)
+        fmt = fmt or _detect_file_format(file_path)
         
         if fmt == 'xml':
             yield from self._parse_xml(file_path)
@@ -429,43 +722,41 @@ class TurboParser:
             # Unknown format; it doesn't throw an error.
             return
     
-    def parse_to_arrow_stream(self, file_path: str, chunk_size: int = 50000) -> Iterator[pa.Table]:
+    def parse_to_arrow_stream(self, file_path: str, chunk_size: int = 50000, fmt: Optional[str] = None,
+                              buffer: Optional[RomColumns] = None) -> Iterator[pa.Table]:
         """
         Consumes the self.parse() generator, buffers the tuples, and yields 
         ready-to-insert PyArrow Tables. 
         
         This is used by Session (Direct Mode) and GUI (Preview).
+        With a caller-owned 'buffer' the tail (< chunk_size rows) is left in it instead of being yielded,
+        so rows from many small files are combined into full-size batches across calls.
         """
-        buffer = []
+        # Columnar buffer, reused across chunks (to_arrow copies the values out)
+        keep_tail = buffer is not None
+        if buffer is None:
+            buffer = RomColumns()
         
         try:
-            record_iterator = self.parse(file_path)
+            record_iterator = self.parse(file_path, fmt)
             
             for record in record_iterator:
-                # Convert Tuple -> Dict (for PyArrow Table)
-                row = {
-                    'filename': record[0], 'platform': record[1], 'category': record[2],
-                    'game_name': record[3], 'title': record[4], 'release_year': record[5],
-                    'description': record[6], 'rom_name': record[7], 'size': record[8],
-                    'crc': record[9], 'md5': record[10], 'sha1': record[11],
-                    'status': record[12], 'system': record[13]
-                }
-                buffer.append(row)
+                buffer.append(*record)
                 
                 # If buffer is full, create an Arrow Table and yield it
                 if len(buffer) >= chunk_size:
-                    yield pa.Table.from_pylist(buffer, schema=self.ARROW_SCHEMA)
-                    buffer = []
+                    yield buffer.to_arrow()
+                    buffer.clear()
             
             # Yield the remainings in buffer
-            if buffer:
-                yield pa.Table.from_pylist(buffer, schema=self.ARROW_SCHEMA)
+            if buffer and not keep_tail:
+                yield buffer.to_arrow()
                 
         except Exception as error:
             logging.error(f"Arrow Stream Error in {file_path}: {error}")
             raise error
         
-    def parse_and_save_chunks(self, file_path: str, output_dir: str, chunk_size: int = 500000) -> Dict:
+    def parse_and_save_chunks(self, file_path: str, output_dir: str, chunk_size: int = 500000, fmt: Optional[str] = None) -> Dict:
         """
         It retrieves data from the data source (generator), buffers it, and writes it as Parquet. 
         It doesn't know whether the data is XML or CMP.
@@ -473,41 +764,128 @@ class TurboParser:
         if not os.path.exists(output_dir):
             os.makedirs(output_dir, exist_ok=True)
             
-        dat_filename = os.path.basename(file_path)
-        buffer = []
+        dat_filename = _get_common_info(file_path)[0]
+        output_path = TurboParser._chunk_path(output_dir, dat_filename)
+        buffer = RomColumns()
+        writer = None
+        # Background writer for full chunks: compression + disk I/O (GIL released by Arrow) overlap
+        # with parsing the next chunk. Created lazily, so DATs that fit into one chunk never start a thread.
+        write_pool = None
+        pending_write = None
         chunk_index = 0
         total_roms = 0
         
         try:
             # 1. Request Data from Source (Pull Model)
             # self.parse will select and run the correct parser.
-            iterator = self.parse(file_path)
+            iterator = self.parse(file_path, fmt)
             
             for record in iterator:
-                # Convert the incoming Tuple to Dictionary (for PyArrow)
-                row = {
-                    'filename': record[0], 'platform': record[1], 'category': record[2],
-                    'game_name': record[3], 'title': record[4], 'release_year': record[5],
-                    'description': record[6], 'rom_name': record[7], 'size': record[8],
-                    'crc': record[9], 'md5': record[10], 'sha1': record[11],
-                    'status': record[12], 'system': record[13]
-                }
-                
-                buffer.append(row)
+                # Columnar buffer: the tuple is written straight into the column lists
+                buffer.append(*record)
                 total_roms += 1
                 
                 # 2. Write and empty the buffer if full.
                 if len(buffer) >= chunk_size:
-                    TurboParser._write_chunk_arrow(buffer, output_dir, dat_filename, chunk_index, self.ARROW_SCHEMA)
-                    buffer = [] 
+                    # One writer per DAT: chunks become row groups of the same file (single footer, no reopen)
+                    if writer is None:
+                        writer = self._open_chunk_writer(output_path)
+                        write_pool = ThreadPoolExecutor(max_workers=1)
+                    
+                    # to_arrow() copies the values out, so the buffer can be refilled while the table is written
+                    table = buffer.to_arrow()
+                    buffer.clear()
+                    # At most one write in flight: keeps row-group order and bounds memory to two chunks
+                    if pending_write is not None:
+                        pending_write.result()
+                    pending_write = write_pool.submit(writer.write_table, table, PARQUET_ROW_GROUP_SIZE)
                     chunk_index += 1
             
+            if pending_write is not None:
+                pending_write.result()
+                pending_write = None
+            
             # 3. Write the last chunk
             if buffer:
-                TurboParser._write_chunk_arrow(buffer, output_dir, dat_filename, chunk_index, self.ARROW_SCHEMA)
+                if writer is None:
+                    writer = self._open_chunk_writer(output_path)
+                writer.write_table(buffer.to_arrow(), PARQUET_ROW_GROUP_SIZE)
+            
+            if writer is not None:
+                writer.close()
+                writer = None
                 
             return {"roms": total_roms, "chunks": chunk_index + 1}
 
         except Exception as e:
             logging.error(f"Staging Error in {file_path}: {e}")
+            # Don't leave a half-written file behind for the bulk import to pick up
+            if writer is not None:
+                if write_pool is not None:
+                    write_pool.shutdown(wait=True)
+                writer.close()
+                os.remove(output_path)
             raise e
+        
+        finally:
+            if write_pool is not None:
+                write_pool.shutdown(wait=True)
+    
+    def parse_many_and_save(self, file_paths: List[str], output_dir: str, chunk_size: int = 500000) -> List[Tuple[Optional[Dict], Optional[Exception]]]:
+        """
+        Stages several (small) DATs into ONE Parquet file, so thousands of tiny DATs don't become
+        thousands of tiny Parquet files for the bulk import to open.
+        Rows are written once a whole file has been parsed, so a broken DAT contributes nothing;
+        returns one (stats, error) pair per input file. If writing the group fails (disk full, a batch
+        Arrow/Parquet rejects), nothing of it is kept and every file gets that error.
+        """
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir, exist_ok=True)
+        
+        output_path = TurboParser._chunk_path(output_dir, _get_common_info(file_paths[0])[0] + ".group")
+        buffer = RomColumns()
+        writer = None
+        results = []
+        
+        try:
+            for file_path in file_paths:
+                file_start = len(buffer)
+                try:
+                    for record in self.parse(file_path):
+                        buffer.append(*record)
+                except Exception as error:
+                    logging.error(f"Staging Error in {file_path}: {error}")
+                    buffer.truncate(file_start)
+                    results.append((None, error))
+                    continue
+                
+                results.append(({"roms": len(buffer) - file_start, "chunks": 1}, None))
+                
+                if len(buffer) >= chunk_size:
+                    if writer is None:
+                        writer = self._open_chunk_writer(output_path)
+                    writer.write_table(buffer.to_arrow(), PARQUET_ROW_GROUP_SIZE)
+                    buffer.clear()
+            
+            if buffer:
+                if writer is None:
+                    writer = self._open_chunk_writer(output_path)
+                writer.write_table(buffer.to_arrow(), PARQUET_ROW_GROUP_SIZE)
+            
+            if writer is not None:
+                writer.close()
+                writer = None
+            
+            return results
+        
+        except Exception as error:
+            # Write failure: don't leave a half-written file behind for the bulk import to pick up
+            logging.error(f"Staging Error in group {output_path}: {error}")
+            try:
+                if writer is not None:
+                    writer.close()
+            except Exception:
+                pass
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            return [(None, error)] * len(file_paths)
@@ -1,49 +1,268 @@
 import os
-from typing import List, Tuple
+import re
+import sys
+from typing import Dict, List, Tuple, Optional
 import threading
+import queue
 import concurrent.futures
-import time
+from concurrent.futures.process import BrokenProcessPool
+import collections
+import itertools
+from functools import partial
 import shutil
 from pathlib import Path
 from tqdm import tqdm
 import logging
+import logging.handlers
 import multiprocessing
-import gc
+from contextlib import contextmanager
 import pyarrow as pa
-import xml.etree.ElementTree as ET
 
 from turbo_tosec.database import DatabaseManager
-from turbo_tosec.parser import InMemoryParser, TurboParser, parse_game_info
-from turbo_tosec.utils import Console
+from turbo_tosec.parser import InMemoryParser, TurboParser, RomColumns
+from turbo_tosec.utils import Console, set_worker_affinity, pid_exists, can_check_pids
 
-def worker_parse_task(file_path: str) -> List[Tuple]:
+# Arrow tables from workers are also flushed once they hold this many bytes, whatever the row count
+FLUSH_BYTES = 64 * 1024 * 1024
+
+# Worker pools: at most this many files per task (the in-flight window is 2 tasks per worker)
+POOL_CHUNK_FILES = 16
+
+# Staged mode: small DATs are parsed together until this much input, one Parquet file per group
+STAGED_GROUP_BYTES = 32 * 1024 * 1024
+# ... or, when file sizes aren't known up front, this many files
+STAGED_GROUP_FILES = 256
+
+# Errors that make every following file fail too (disk full / read-only target): abort the import
+_FATAL_DISK_ERROR = re.compile(r'not enough space|read-only file system', re.IGNORECASE)
+
+# Per-process parser singletons: built once per worker by worker_init (or lazily on first use),
+# not once per file.
+_WORKER_PARSER: Optional[InMemoryParser] = None
+_WORKER_TURBO_PARSER: Optional[TurboParser] = None
+
+def _init_worker_parsers():
+    global _WORKER_PARSER, _WORKER_TURBO_PARSER
+    _WORKER_PARSER = InMemoryParser()
+    _WORKER_TURBO_PARSER = TurboParser()
+
+def worker_init(slots=None, n_workers: int = 0, log_queue=None, log_level: int = logging.WARNING):
     """
-    Worker for InMemoryMode: Parses XML completely into RAM (and returns list of tuples).
+    ProcessPoolExecutor initializer: builds the worker's parsers, forwards its log records to the parent
+    (spawn/forkserver workers don't inherit the parent's handlers) and, when an affinity slot table is given,
+    claims a free slot and pins the worker process to that slot's CPU slice.
     """
-    parser = InMemoryParser()
-    return parser.parse(file_path)
+    if log_queue is not None:
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(log_level)
+    
+    _init_worker_parsers()
+    if slots is None:
+        return
+    
+    worker_id = _claim_affinity_slot(slots)
+    if worker_id is not None:
+        set_worker_affinity(worker_id, n_workers)
+
+def _claim_affinity_slot(slots) -> Optional[int]:
+    """
+    Takes the first slot that is unused or whose worker has exited (recycled by max_tasks_per_child),
+    so a replacement worker gets the cores of the worker it replaces. None if every slot is taken.
+    """
+    pid = os.getpid()
+    with slots.get_lock():
+        for slot, owner in enumerate(slots):
+            if owner == 0 or owner == pid or not pid_exists(owner):
+                slots[slot] = pid
+                return slot
+    return None
+
+def _run_chunk(fn, items: list) -> list:
+    return [fn(item) for item in items]
+
+# A worker that died (segfault, OOM kill, failed spawn) breaks the pool: every future in flight fails with these
+_POOL_FAILURES = (BrokenProcessPool, concurrent.futures.CancelledError)
+
+def _submit_chunk(executor, fn, chunk: list) -> concurrent.futures.Future:
+    try:
+        return executor.submit(_run_chunk, fn, chunk)
+    except BrokenProcessPool as error:
+        # Broke since the last result came in: fails (and is retried) like the chunks already in flight
+        future = concurrent.futures.Future()
+        future.set_exception(error)
+        return future
+
+def _bounded_map(executor, fn, items, window: int, chunksize: int = 1, on_error=None):
+    """
+    Ordered Executor.map that submits lazily: at most 'window' chunks of 'chunksize' items are in flight,
+    so neither the futures nor finished-but-unconsumed results pile up for the whole file list.
+    
+    With 'on_error' (executor must be a _WorkerPool), a broken pool doesn't end the map: the items in flight
+    are run again one at a time on a fresh pool, and each one that breaks it again yields on_error(item, error).
+    """
+    iterator = iter(items)
+    pending = collections.deque()
+    while True:
+        while len(pending) < window:
+            chunk = list(itertools.islice(iterator, chunksize))
+            if not chunk:
+                break
+            pending.append((chunk, _submit_chunk(executor, fn, chunk)))
+        
+        if not pending:
+            return
+        chunk, future = pending.popleft()
+        try:
+            results = future.result()
+        except _POOL_FAILURES as error:
+            if on_error is None:
+                raise
+            # Which in-flight item killed its worker is unknown; isolate it
+            suspects = chunk + [item for other, _ in pending for item in other]
+            pending.clear()
+            logging.warning("Worker pool broke (%s); retrying %d in-flight item(s) one by one.", error, len(suspects))
+            yield from _retry_one_by_one(executor, fn, suspects, on_error)
+            continue
+        yield from results
+
+def _retry_one_by_one(pool: "_WorkerPool", fn, items: list, on_error):
+    broken = True
+    for item in items:
+        if broken:
+            pool.restart()
+            broken = False
+        try:
+            result = pool.submit(_run_chunk, fn, [item]).result()[0]
+        except _POOL_FAILURES as error:
+            result = on_error(item, error)
+            broken = True
+        yield result
+    if broken:
+        pool.restart()
+
+class _WorkerPool:
+    """ProcessPoolExecutor that can be replaced by a fresh one after a dead worker broke it (see _bounded_map)."""
+    def __init__(self, factory):
+        self._factory = factory
+        self.executor = factory()
+    
+    def submit(self, fn, *args):
+        return self.executor.submit(fn, *args)
+    
+    def restart(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.executor = self._factory()
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+def _failed_file(file_path: str, error: BaseException) -> Tuple[None, BaseException]:
+    """_bounded_map on_error for the per-file (result, error) workers."""
+    return None, error
+
+def worker_parse_task(file_path: str) -> Optional[pa.Table]:
+    """
+    Worker for InMemoryMode: Parses XML completely into RAM and returns it as an Arrow table.
+    Tables pickle as contiguous column buffers, so the IPC hop is far cheaper than shipping
+    Python objects, and the Arrow conversion itself runs in the worker instead of the parent.
+    """
+    if _WORKER_PARSER is None:
+        _init_worker_parsers()
+    data = _WORKER_PARSER.parse(file_path)
+    return data.to_arrow() if data else None
+
+def worker_parse_task_safe(file_path: str) -> Tuple[Optional[pa.Table], Optional[Exception]]:
+    """
+    worker_parse_task for Executor.map: returns (data, error) instead of raising,
+    so one broken file doesn't abort the whole ordered result stream.
+    """
+    try:
+        return worker_parse_task(file_path), None
+    except Exception as error:
+        return None, error
+
+def worker_direct_task(file_path: str, chunk_size: int) -> Optional[pa.Table]:
+    """
+    Worker for DirectMode: Streams the file through TurboParser and returns its rows as one Arrow table.
+    """
+    try:
+        if _WORKER_TURBO_PARSER is None:
+            _init_worker_parsers()
+        tables = list(_WORKER_TURBO_PARSER.parse_to_arrow_stream(file_path, chunk_size=chunk_size))
+        return pa.concat_tables(tables) if tables else None
+    except Exception as error:
+        # lxml's errors don't pickle; send the message back instead
+        raise RuntimeError(f"Error in {os.path.basename(file_path)}: {error}")
+
+def worker_direct_task_safe(file_path: str, chunk_size: int) -> Tuple[Optional[pa.Table], Optional[Exception]]:
+    """worker_direct_task for Executor.map: returns (table, error) instead of raising."""
+    try:
+        return worker_direct_task(file_path, chunk_size), None
+    except Exception as error:
+        return None, error
 
 def worker_staged_task(file_path: str, temp_dir: str) -> dict:
     """
     Worker for StagedMode: Parses XML and writes chunks to intermediate Parquet files.
     """
     try:
-        parser = TurboParser()
-        result_stats = parser.parse_and_save_chunks(file_path, temp_dir)
+        if _WORKER_TURBO_PARSER is None:
+            _init_worker_parsers()
+        result_stats = _WORKER_TURBO_PARSER.parse_and_save_chunks(file_path, temp_dir)
         return result_stats
     except Exception as error:
         raise RuntimeError(f"Error in {os.path.basename(file_path)}: {error}")
+
+def worker_staged_task_safe(file_path: str, temp_dir: str) -> Tuple[Optional[dict], Optional[Exception]]:
+    """worker_staged_task for Executor.map: returns (stats, error) instead of raising."""
+    try:
+        return worker_staged_task(file_path, temp_dir), None
+    except Exception as error:
+        return None, error
+
+def worker_staged_group_task(file_paths: List[str], temp_dir: str) -> List[Tuple[Optional[dict], Optional[Exception]]]:
+    """
+    Worker for StagedMode over a group of files: runs of small files are staged together into one Parquet file,
+    a single file or one of at least STAGED_GROUP_BYTES is streamed through parse_and_save_chunks.
+    (Groups built without sizes can contain large files; they are stat'ed here, off the parent's thread.)
+    Returns (stats, error) per file, in input order.
+    """
+    if len(file_paths) == 1:
+        return [worker_staged_task_safe(file_paths[0], temp_dir)]
     
-def get_dat_files(root_dir: str) -> List[str]:
-    """Finds all .dat files in the specified directory and its subdirectories."""
-    dat_files = []
-    for root, _, files in os.walk(root_dir):
-        for file in files:
-            if file.lower().endswith(".dat"):
-                dat_files.append(os.path.join(root, file))
-                
-    return dat_files
+    results = []
+    small = []
+    for file_path in file_paths:
+        try:
+            large = os.path.getsize(file_path) >= STAGED_GROUP_BYTES
+        except OSError:
+            large = False
+        if not large:
+            small.append(file_path)
+            continue
+        results.extend(_stage_small_files(small, temp_dir))
+        small = []
+        results.append(worker_staged_task_safe(file_path, temp_dir))
+    results.extend(_stage_small_files(small, temp_dir))
+    return results
 
+def _stage_small_files(file_paths: List[str], temp_dir: str) -> List[Tuple[Optional[dict], Optional[Exception]]]:
+    if not file_paths:
+        return []
+    try:
+        if _WORKER_TURBO_PARSER is None:
+            _init_worker_parsers()
+        results = _WORKER_TURBO_PARSER.parse_many_and_save(file_paths, temp_dir)
+    except Exception as error:
+        # Staging the group failed as a whole (e.g. the staging dir can't be created): so does each file
+        results = [(None, error)] * len(file_paths)
+    # lxml's errors don't pickle; send the message back instead
+    return [(stats, RuntimeError(f"Error in {os.path.basename(path)}: {error}") if error else None)
+            for path, (stats, error) in zip(file_paths, results)]
+    
 class ImportSession:
     """
     Orchestrates the ingestion workflow.
@@ -54,15 +273,20 @@ class ImportSession:
     3. DirectMode
     """
     def __init__(self, db_manager: DatabaseManager, args=None,  # Optional for CLI
-                 workers: int = 0, temp_dir: str = "temp_chunks", batch_size: int = 1000):
+                 workers: int = 0, temp_dir: str = "temp_chunks", batch_size: int = 100_000, affinity: bool = False,
+                 direct_flush_threshold: int = 100_000, max_tasks_per_child: int = 0):
         
         self.args = args
         self.db = db_manager
-        self.buffer = []
+        self.buffer = None # Pre-sized RomColumns, created by legacy serial runs only (see _run_serial)
+        self.pending_tables = [] # Arrow tables received from parallel workers
+        self.pending_rows = 0
+        self.pending_bytes = 0
         self.total_roms = 0
         self.error_count = 0
-        self.stop_monitor = threading.Event()
         self.executor = None # To track active executor for cleanup
+        self._sizes = {} # file_path -> size in bytes, filled once per ingest()
+        self._unsized = [] # files of the current ingest() whose size is still unknown
 
         # Strategy Selection
         # ----------------------------------------------------------
@@ -78,10 +302,18 @@ class ImportSession:
             self.workers = getattr(args, 'workers', 0)
             self.temp_dir = getattr(args, 'temp_dir', temp_dir)
             self.batch_size = getattr(args, 'batch_size', batch_size)
+            self.affinity = getattr(args, 'affinity', affinity)
+            self.db_threads = getattr(args, 'db_threads', 1)
+            self.direct_flush_threshold = getattr(args, 'direct_flush_threshold', direct_flush_threshold)
+            self.max_tasks_per_child = getattr(args, 'max_tasks_per_child', max_tasks_per_child)
         else:
             self.workers = workers
             self.temp_dir = temp_dir    # Temp dir is only relevant for Staged Mode
             self.batch_size = batch_size
+            self.affinity = affinity
+            self.db_threads = 1
+            self.direct_flush_threshold = direct_flush_threshold
+            self.max_tasks_per_child = max_tasks_per_child
         
         # CPU core limit check
         max_cpu = multiprocessing.cpu_count()
@@ -91,7 +323,8 @@ class ImportSession:
     # *************************************************************************
     # LIBRARY API
     # *************************************************************************
-    def ingest(self, files: List[str], mode: str = 'staged', progress_callback = None) -> dict:
+    def ingest(self, files: List[str], mode: str = 'staged', progress_callback = None, 
+               sizes: Optional[Dict[str, int]] = None) -> dict:
         """
         High-level entry point for Library/GUI usage.
         
@@ -99,7 +332,9 @@ class ImportSession:
             files: List of file paths to process.
             mode: 'direct' (Recommended), 'staged' (Big Data), 'legacy' (Memory).
             show_progress: If False, disables tqdm (useful for silent workers).
-            progress_callback: A function(current, total) to handle GUI updates.
+            progress_callback: A function(current, total) to handle GUI updates; always called on the calling thread.
+            sizes: Optional {file_path: size} from the directory scan (see get_dat_file_sizes);
+                   only files missing from it are stat'ed.
         
         Returns:
             dict: {'total_roms': int, 'errors': int}
@@ -113,8 +348,12 @@ class ImportSession:
         self.total_roms = 0
         self.error_count = 0
         
-        # Metrics
-        total_bytes = sum(os.path.getsize(f) for f in files)
+        # Metrics: sizes from the directory scan are used as-is; any other file is stat'ed
+        # in the background while parsing already runs (see _progress), growing the bar's total.
+        known = sizes or {}
+        self._sizes = {f: known[f] for f in files if f in known}
+        self._unsized = [f for f in files if f not in known]
+        total_bytes = sum(known[f] for f in files if f in known)
         
         # Preparing for Staged mode
         if mode == 'staged':
@@ -123,31 +362,46 @@ class ImportSession:
         # GUI entegrasyonunda buradaki tqdm'i override etmek gerekebilir
         # ama şimdilik console output varsayıyoruz.
         
+        rolled_back, rolled_back_files = self.db.rolled_back_rows, len(self.db.rolled_back_files)
         try:
-            if mode == 'direct':
-                # Direct mode genellikle GUI için en iyisidir (Hızlı geri bildirim)
-                self._run_direct_mode(files, total_bytes, 0, progress_callback)
-            
-            elif mode == 'staged':
-                self._run_staged_mode(files, self.workers, total_bytes, 0, progress_callback)
-                
-            elif mode == 'legacy':
-                self._run_in_memory_mode(files, self.workers, total_bytes, 0, progress_callback)
-            
-            else:
-                raise ValueError(f"Unknown ingestion mode: {mode}")
+            # Bulk-load scope: relaxed insertion order + one transaction (joins the caller's, if any)
+            with self.db.bulk_load():
+                self._run_mode(files, mode, total_bytes, progress_callback)
                 
         finally:
             # Clean-up
             if mode == 'staged' and os.path.exists(self.temp_dir):
                 shutil.rmtree(self.temp_dir)
         
+        # Rows a caught database error rolled back (see DatabaseManager._recover_aborted_transaction)
+        lost = self.db.rolled_back_rows - rolled_back
+        lost_files = len(self.db.rolled_back_files) - rolled_back_files
+        if lost or lost_files:
+            self.total_roms -= lost
+            Console.warning(f"{lost:,} ROMs of {lost_files:,} files were rolled back after a database error (see logs); "
+                            "resume to import those files again.")
+        
         return {'total_roms': self.total_roms, 'errors': self.error_count}
     
+    def _run_mode(self, files, mode, total_bytes, progress_callback=None):
+        """Dispatches to the ingestion strategy."""
+        if mode == 'direct':
+            # Direct mode genellikle GUI için en iyisidir (Hızlı geri bildirim)
+            self._run_direct_mode(files, total_bytes, 0, progress_callback)
+        
+        elif mode == 'staged':
+            self._run_staged_mode(files, self.workers, total_bytes, 0, progress_callback)
+            
+        elif mode == 'legacy':
+            self._run_in_memory_mode(files, self.workers, total_bytes, 0, progress_callback)
+        
+        else:
+            raise ValueError(f"Unknown ingestion mode: {mode}")
+    
     # *************************************************************************
     # CLI API
     # *************************************************************************
-    def run(self, files_to_process: List[str]):
+    def run(self, files_to_process: List[str], sizes: Optional[Dict[str, int]] = None):
         """
         Main execution entry point.
         """
@@ -160,75 +414,61 @@ class ImportSession:
             
          # ASCII Banner
         Console.banner()
-        stats = self.ingest(files_to_process, mode=mode)
+        stats = self.ingest(files_to_process, mode=mode, sizes=sizes)
         
         return stats['total_roms'], stats['errors']
 
     # Strategy 1: In-memory
     def _run_in_memory_mode(self, files, workers, total_bytes, initial_bytes, progress_callback=None):
         
-        with UniversalProgress(total=total_bytes, initial=initial_bytes, 
-                               desc="Direct Ingestion", callback=progress_callback) as pbar:
+        with self._progress(total_bytes, initial_bytes, "Direct Ingestion", progress_callback) as pbar:
             
-            self._start_monitor(pbar)
             if workers < 2:
                 self._run_serial(files, pbar)
             else:
                 self._run_parallel(files, workers, pbar)
-                
-            self._stop_monitor()
         
         self._flush_buffer() # Write any remaining data
 
     # Strategy 2: Staged 
     def _run_staged_mode(self, files, workers, total_bytes, initial_bytes, progress_callback=None):
         # Parse -> Parquet Files -> Bulk Import
-        with UniversalProgress(total=total_bytes, initial=initial_bytes, 
-                               desc="Direct Ingestion", callback=progress_callback) as pbar:
+        with self._progress(total_bytes, initial_bytes, "Direct Ingestion", progress_callback) as pbar:
             
-            self._start_monitor(pbar)
-            executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
-            
-            try:
+            with self._process_pool(workers) as executor:
                 self.executor = executor
-                # Call Staging worker
-                future_to_file = {executor.submit(worker_staged_task, f, self.temp_dir): f for f in files}
+                try:
+                    # Call Staging worker: small files are grouped so each group becomes one Parquet file
+                    groups = self._group_files(files, workers)
+                    group_results = _bounded_map(executor, partial(worker_staged_group_task, temp_dir=self.temp_dir), groups, 
+                                                 window=workers * 2, on_error=lambda group, error: [(None, error)] * len(group))
+                    results = (result for group_result in group_results for result in group_result)
                 
-                for future in concurrent.futures.as_completed(future_to_file):
-                    file_path = future_to_file[future]
-                    try:
-                        stats = future.result() # Return as Dict: {'roms': 500, 'size': 1024}
-                        
-                        # Check Skipped Files (for Legacy CMP files)
-                        if stats.get("skipped"):
-                            tqdm.write(f"{Console.SYM_INFO} Skipped: {stats.get('file')} ({stats.get('reason')})")
-                            # Push the bar amount of the size of the file so it can reach 100%.
-                            try:
-                                pbar.update(os.path.getsize(file_path))
-                            except:
-                                pbar.update(0)
+                    for file_path, (stats, error) in zip(files, results):
+                        if error is not None:
+                            self._handle_error(error, file_path)
                             continue
+                        try:
+                            # stats: {'roms': 500, 'chunks': 1} or {'skipped': True, ...}
+                            # Check Skipped Files (for Legacy CMP files)
+                            if stats.get("skipped"):
+                                tqdm.write(f"{Console.SYM_INFO} Skipped: {stats.get('file')} ({stats.get('reason')})")
+                                # Push the bar amount of the size of the file so it can reach 100%.
+                                pbar.update(self._file_size(file_path))
+                                continue
                         
-                        # Update stats
-                        self.total_roms += stats.get('roms', 0)
+                            # Update stats
+                            self.total_roms += stats.get('roms', 0)
                         
-                        # Update Progress-bar 
-                        try:
-                            file_size = os.path.getsize(file_path)
-                            pbar.update(file_size)
-                        except:
-                            pbar.update(0)
+                            # Update Progress-bar 
+                            pbar.update(self._file_size(file_path))
 
-                        pbar.set_postfix({"ROMs": self.total_roms})
+                            pbar.set_postfix({"ROMs": self.total_roms})
 
-                    except Exception as error:
-                        self._handle_error(error, file_path)
-            finally:
-                self.executor.shutdown(wait=True)
-                self.executor = None
-                del executor
-                gc.collect()
-                self._stop_monitor()
+                        except Exception as error:
+                            self._handle_error(error, file_path)
+                finally:
+                    self.executor = None
 
         # Bulk Import into DUCKDB
         if self.total_roms > 0:
@@ -246,59 +486,164 @@ class ImportSession:
     def _run_direct_mode(self, files, total_bytes, initial_bytes, progress_callback=None):
         """
         Parses XML stream and injects directly into DuckDB via Arrow.
-        Runs in Main Thread to utilize DuckDB's connection safely.
+        Parsing runs on one background thread (or, with several workers, in a process pool fed from it)
+        and hands Arrow tables over a bounded queue; inserts stay on the calling thread to utilize
+        DuckDB's connection safely. DuckDB releases the GIL while it ingests a batch, so the next
+        batch is parsed meanwhile.
+        A batch combines the rows of several files: if its insert fails, each of those files is reported as failed.
         """
-        parser = TurboParser()
-            
-        with UniversalProgress(total=total_bytes, initial=initial_bytes, 
-                               desc="Direct Ingestion", callback=progress_callback) as pbar:
-            
+        chunk_size = self.direct_flush_threshold
+        # ("batch", table, files with rows in it) | ("done", file_path) | ("error", file_path, error)
+        events = queue.Queue(maxsize=4)
+        stop = threading.Event()
+        
+        def put(item) -> bool:
+            # Bounded put that gives up once the consumer has stopped (e.g. an insert failed)
+            while not stop.is_set():
+                try:
+                    events.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def produce_serial():
+            parser = TurboParser()
+            # Shared across files: small DATs are combined into full batches instead of one tiny insert each
+            buffer = RomColumns.with_capacity(chunk_size)
+            buffered_files = []  # earlier files with rows still in the buffer
             for file_path in files:
+                # Rows of this file still in the buffer start here (reset whenever a batch is flushed)
+                file_start = len(buffer)
                 try:
-                    arrow_stream = parser.parse_to_arrow_stream(file_path, chunk_size=50000)
-                    for arrow_batch in arrow_stream:
-                        # 1. DuckDB'ye Hızlı Kayıt (Zero-Copy sayılır)
-                        # 'arrow_batch' değişkeni SQL sorgusu içinde doğrudan kullanılır.
-                        self.db.conn.execute("INSERT INTO roms SELECT * FROM arrow_batch")
+                    for arrow_batch in parser.parse_to_arrow_stream(file_path, chunk_size=chunk_size, buffer=buffer):
+                        if not put(("batch", arrow_batch, buffered_files + [file_path])):
+                            return
+                        buffered_files = []
+                        file_start = 0
+                    
+                    if len(buffer) > file_start:
+                        buffered_files.append(file_path)
+                    if not put(("done", file_path)):
+                        return
+                    
+                except Exception as error:
+                    # Same as before: a broken file's unflushed rows are not imported
+                    buffer.truncate(file_start)
+                    if not put(("error", file_path, error)):
+                        return
+            
+            if buffer:
+                put(("batch", buffer.to_arrow(), buffered_files))
+        
+        def produce_parallel():
+            # Parsing is pure-Python work that holds the GIL, so files are parsed in worker processes;
+            # this thread only batches their tables up for the inserting thread.
+            pending, pending_files, pending_rows, pending_bytes = [], [], 0, 0
+            with self._process_pool(self.workers) as executor:
+                results = _bounded_map(executor, partial(worker_direct_task_safe, chunk_size=chunk_size), files, 
+                                       window=self.workers * 2, chunksize=self._pool_chunksize(files, self.workers),
+                                       on_error=_failed_file)
+                
+                for file_path, (table, error) in zip(files, results):
+                    if error:
+                        if not put(("error", file_path, error)):
+                            return
+                        continue
+                    
+                    if table is not None:
+                        pending.append(table)
+                        pending_files.append(file_path)
+                        pending_rows += table.num_rows
+                        pending_bytes += table.nbytes
+                        
+                        if pending_rows >= chunk_size or pending_bytes >= FLUSH_BYTES:
+                            if not put(("batch", pa.concat_tables(pending), pending_files)):
+                                return
+                            pending, pending_files, pending_rows, pending_bytes = [], [], 0, 0
+                    
+                    if not put(("done", file_path)):
+                        return
+                
+                if pending:
+                    put(("batch", pa.concat_tables(pending), pending_files))
+        
+        failure = []
+        
+        def produce():
+            try:
+                if self.workers > 1 and len(files) > 1:
+                    produce_parallel()
+                else:
+                    produce_serial()
+            except BaseException as error:
+                # Re-raised on the calling thread once the producer has stopped
+                failure.append(error)
+            finally:
+                put(None)
+        
+        failed_files = set()
+        
+        with self._progress(total_bytes, initial_bytes, "Direct Ingestion", progress_callback) as pbar:
+            
+            producer = threading.Thread(target=produce, name="direct-parser", daemon=True)
+            producer.start()
+            try:
+                while True:
+                    event = events.get()
+                    if event is None:
+                        break
+                    
+                    kind = event[0]
+                    if kind == "batch":
+                        # 1. Fast write to DuckDB (Zero-Copy Arrow scan)
+                        arrow_batch = event[1]
+                        try:
+                            self.db.insert_arrow(arrow_batch)
+                        except Exception as error:
+                            # The rows of every file in the batch are lost; a full disk still ends the run
+                            for file_path in event[2]:
+                                if file_path not in failed_files:
+                                    failed_files.add(file_path)
+                                    self._handle_error(error, file_path)
+                            continue
                         
                         # 2. İstatistikleri Güncelle
-                        rows_in_batch = arrow_batch.num_rows
-                        self.total_roms += rows_in_batch
+                        self.total_roms += arrow_batch.num_rows
                         pbar.set_postfix({"ROMs": self.total_roms})
-
-                    # 3. Progress Bar (Dosya boyutu kadar ilerlet)
-                    try:
-                        pbar.update(os.path.getsize(file_path))
-                    except:
-                        pbar.update(0)
                         
-                except Exception as error:
-                    self._handle_error(error, file_path)
+                    elif kind == "done":
+                        # 3. Progress Bar (Dosya boyutu kadar ilerlet)
+                        pbar.update(self._file_size(event[1]))
+                        
+                    elif event[1] not in failed_files:
+                        failed_files.add(event[1])
+                        self._handle_error(event[2], event[1])
+            finally:
+                stop.set()
+                producer.join()
+            
+            if failure:
+                raise failure[0]
             
-    def _start_monitor(self, pbar):
-        self.stop_monitor.clear()
-        def monitor_progress():
-            while not self.stop_monitor.is_set():
-                time.sleep(1)
-                if hasattr(pbar, 'console_bar') and pbar.console_bar:
-                    pbar.console_bar.refresh()
-        
-        self.monitor_thread = threading.Thread(target=monitor_progress, daemon=True)
-        self.monitor_thread.start()
-
-    def _stop_monitor(self):
-        self.stop_monitor.set()
-        if hasattr(self, 'monitor_thread'):
-            self.monitor_thread.join()        
-    
     def _flush_buffer(self):
         if self.buffer:
             self.db.insert_batch(self.buffer)
             self.total_roms += len(self.buffer)
             self.buffer.clear()
+        
+        if self.pending_tables:
+            self.db.insert_batch(pa.concat_tables(self.pending_tables))
+            self.total_roms += self.pending_rows
+            self.pending_tables = []
+            self.pending_rows = 0
+            self.pending_bytes = 0
 
     def _run_serial(self, files, pbar):
         
+        # The only path that collects rows in Python: sized for a full batch, once per session
+        if self.buffer is None:
+            self.buffer = RomColumns.with_capacity(self.batch_size)
         parser = InMemoryParser()
         for file_path in files:
             try:
@@ -310,13 +655,15 @@ class ImportSession:
 
     def _run_parallel(self, files, workers, pbar):
         
-        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
-            future_to_file = {executor.submit(worker_parse_task, f): f for f in files}
+        with self._process_pool(workers) as executor:
+            results = _bounded_map(executor, worker_parse_task_safe, files, 
+                                   window=workers * 2, chunksize=self._pool_chunksize(files, workers), on_error=_failed_file)
             
-            for future in concurrent.futures.as_completed(future_to_file):
-                file_path = future_to_file[future]
+            for file_path, (data, error) in zip(files, results):
+                if error is not None:
+                    self._handle_error(error, file_path)
+                    continue
                 try:
-                    data = future.result()
                     self._process_result(data, file_path, pbar)
                     
                 except Exception as error:
@@ -324,21 +671,158 @@ class ImportSession:
                     
     def _process_result(self, data, file_path, pbar):
         
-        if data:
+        if isinstance(data, pa.Table):
+            self.pending_tables.append(data)
+            self.pending_rows += data.num_rows
+            self.pending_bytes += data.nbytes
+        elif data:
             self.buffer.extend(data)
-            if len(self.buffer) >= self.args.batch_size:
-                self._flush_buffer()
+        
+        # Row count alone flushes far too late for DATs with long names/descriptions
+        buffered = len(self.buffer) if self.buffer is not None else 0
+        if buffered + self.pending_rows >= self.batch_size or self.pending_bytes >= FLUSH_BYTES:
+            self._flush_buffer()
         
         # Update stats
         stats = {"ROMs": self.total_roms}
         if self.error_count > 0:
             stats["Errors"] = self.error_count
         pbar.set_postfix(stats)
+        pbar.update(self._file_size(file_path))
+
+    @staticmethod
+    def _pool_chunksize(files: List[str], workers: int) -> int:
+        """Files per pool task: one IPC round-trip per chunk, but small enough to keep results and load balanced."""
+        return max(1, min(POOL_CHUNK_FILES, len(files) // (workers * 4)))
+
+    @contextmanager
+    def _process_pool(self, workers: int):
+        """
+        Worker pool for the duration of the block; with 'affinity' each worker is pinned to its own share of the cores.
+        Workers are replaced after 'max_tasks_per_child' work items (opt-in, Python 3.11+), so memory the
+        parsers' allocators hold on to is handed back to the OS on long runs instead of piling up.
+        That needs the forkserver/spawn start method, so the calling script must guard its entry point with
+        'if __name__ == "__main__":'; without it the platform's default start method is used.
+        Worker log records are handled by the parent's root handlers (log file), not printed by the workers.
+        Yields a _WorkerPool, so a pool broken by a dead worker can be replaced mid-run.
+        """
+        context = multiprocessing.get_context()
+        options = {}
+        if self.max_tasks_per_child and sys.version_info >= (3, 11):
+            # Worker replacement isn't supported with 'fork'. A forkserver that has already imported the
+            # session (pyarrow, lxml, duckdb) forks new workers cheaply; spawn re-imports all of it per worker.
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload([__name__])
+            else:
+                context = multiprocessing.get_context("spawn")
+            options["max_tasks_per_child"] = self.max_tasks_per_child
+        options["mp_context"] = context
+        
+        root = logging.getLogger()
+        listener = None
+        log_queue = None
+        if root.handlers:
+            log_queue = context.Queue()
+            listener = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+            listener.start()
         
+        # Affinity slot table: worker pid per slot (created in the pool's start context).
+        # Recycled workers free their slot by exiting, so without a liveness check (Windows without psutil) don't pin at all.
+        slots = None
+        if self.affinity:
+            if can_check_pids():
+                slots = context.Array('i', workers)
+            else:
+                logging.warning("CPU affinity needs psutil on this platform, workers are not pinned.")
+        pool = _WorkerPool(partial(concurrent.futures.ProcessPoolExecutor, max_workers=workers, initializer=worker_init, 
+                                   initargs=(slots, workers, log_queue, root.level), **options))
         try:
-            pbar.update(os.path.getsize(file_path))
-        except:
-            pbar.update(0)
+            yield pool
+        finally:
+            pool.shutdown()
+            if listener is not None:
+                listener.stop()
+
+    @contextmanager
+    def _progress(self, total_bytes: int, initial_bytes: int, desc: str, progress_callback=None):
+        """
+        Opens the progress bar. Files without a known size are stat'ed on a background thread,
+        which adds them to the bar's total, so the first file starts parsing immediately.
+        """
+        with UniversalProgress(total=total_bytes, initial=initial_bytes, desc=desc, callback=progress_callback) as pbar:
+            sizer = None
+            if self._unsized:
+                unsized, self._unsized = self._unsized, []
+                
+                def size_files():
+                    sizes = self._stat_files(unsized)
+                    self._sizes.update(sizes)
+                    pbar.add_total(sum(sizes[f] for f in unsized))
+                
+                sizer = threading.Thread(target=size_files, name="file-sizer", daemon=True)
+                sizer.start()
+            try:
+                yield pbar
+            finally:
+                if sizer is not None:
+                    sizer.join()
+                    pbar.refresh()
+
+    def _file_size(self, file_path: str) -> int:
+        """Cached size of an input file (stat'ed here if the background sizer hasn't got to it yet)."""
+        size = self._sizes.get(file_path)
+        if size is None:
+            try:
+                size = os.path.getsize(file_path)
+            except OSError:
+                size = 0
+            self._sizes[file_path] = size
+        return size
+
+    def _group_files(self, files: List[str], workers: int) -> List[List[str]]:
+        """
+        Splits 'files' (order kept) into consecutive groups of up to STAGED_GROUP_BYTES of DAT data
+        (less when needed to keep every worker busy); a file at least that large is a group of its own.
+        Without a size for every file (library callers; the background sizer may still be running)
+        nothing is stat'ed here: files are grouped by count, and the worker streams large ones separately.
+        """
+        target_groups = workers * 4
+        if not all(f in self._sizes for f in files):
+            per_group = max(1, min(STAGED_GROUP_FILES, -(-len(files) // target_groups)))
+            return [files[i:i + per_group] for i in range(0, len(files), per_group)]
+        
+        limit = min(STAGED_GROUP_BYTES, max(1, sum(self._sizes[f] for f in files) // target_groups))
+        groups, group, group_bytes = [], [], 0
+        for file_path in files:
+            size = self._sizes[file_path]
+            if group and group_bytes + size > limit:
+                groups.append(group)
+                group, group_bytes = [], 0
+            group.append(file_path)
+            group_bytes += size
+        if group:
+            groups.append(group)
+        return groups
+    
+    @staticmethod
+    def _stat_files(files: List[str], max_workers: int = 32) -> Dict[str, int]:
+        """
+        Returns {file_path: size}; files that can't be stat'ed count as 0 bytes.
+        stat releases the GIL, so on network shares a thread pool keeps many calls in flight
+        instead of paying one round-trip per file.
+        """
+        def _size(file_path):
+            try:
+                return os.path.getsize(file_path)
+            except OSError:
+                return 0
+        
+        if len(files) < 64:
+            return {file_path: _size(file_path) for file_path in files}
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(files, executor.map(_size, files, chunksize=16)))
 
     def _prepare_temp_dir(self):
         """Cleans or creates the temporary staging directory for Parquet chunks."""
@@ -353,8 +837,7 @@ class ImportSession:
 
     def _handle_error(self, error, file_path):
         
-        error_msg = str(error).lower()
-        if "not enough space" in error_msg or "read-only file system" in error_msg:
+        if _FATAL_DISK_ERROR.search(str(error)):
              raise OSError("CRITICAL: Disk is full or not writable!") from error
              
         self.error_count += 1
@@ -367,31 +850,67 @@ class UniversalProgress:
     A wrapper that abstracts progress reporting.
     If a 'callback' is provided (GUI mode), it invokes the callback.
     If no callback is provided (CLI mode), it uses 'tqdm' for console output.
+    Both are only touched from the thread that calls update()/refresh(): totals added from
+    other threads (add_total) are held until then, so a GUI callback needn't be thread-safe.
     """
     def __init__(self, total: int, initial: int = 0, desc: str = "", unit: str = 'B', callback=None):
         
         self.callback = callback
         self.total = total
         self.current = initial
+        # (compared with None: an empty tqdm bar is falsy)
         self.console_bar = None
+        # Total discovered by add_total() and not yet applied (guarded by _lock)
+        self._pending_total = 0
+        self._lock = threading.Lock()
         
         if not self.callback:
             # CLI Mode: Initialize tqdm
-            self.console_bar = tqdm(total=total, initial=initial, unit=unit, unit_scale=True, unit_divisor=1024, desc=desc)
+            # tqdm throttles redraws itself (mininterval/maxinterval), no refresh thread needed
+            self.console_bar = tqdm(total=total, initial=initial, unit=unit, unit_scale=True, unit_divisor=1024, desc=desc,
+                                    mininterval=0.5, maxinterval=2.0, smoothing=0.1)
 
     def update(self, n: int):
         
+        self._apply_pending_total()
         self.current += n
-        if self.console_bar:
+        if self.console_bar is not None:
             self.console_bar.update(n)
         elif self.callback:
             # GUI Mode: Send (current, total)
             # The GUI will take these values ​​and set the progress bar.
             self.callback(self.current, self.total)
 
+    def add_total(self, n: int):
+        """
+        Grows the expected total (sizes discovered after the bar was opened). Safe to call from any thread;
+        the bar/callback sees it on the next update() or refresh().
+        """
+        with self._lock:
+            self._pending_total += n
+
+    def refresh(self):
+        """Reports a total grown by add_total() without advancing the bar."""
+        if not self._apply_pending_total():
+            return
+        if self.console_bar is not None:
+            self.console_bar.refresh()
+        elif self.callback:
+            self.callback(self.current, self.total)
+
+    def _apply_pending_total(self) -> bool:
+        with self._lock:
+            n, self._pending_total = self._pending_total, 0
+        if not n:
+            return False
+        self.total += n
+        if self.console_bar is not None:
+            self.console_bar.total += n
+        return True
+
     def set_postfix(self, stats: dict):
         
-        if self.console_bar:
+        if self.console_bar is not None:
             self.console_bar.set_postfix(stats)
         elif self.callback:
             # Optional: This can be expanded if the GUI callback accepts a third parameter (stats). 
@@ -400,7 +919,7 @@ class UniversalProgress:
 
     def close(self):
         
-        if self.console_bar:
+        if self.console_bar is not None:
             self.console_bar.close()
 
     def __enter__(self): 
@@ -1,9 +1,10 @@
 import os
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
-import os
 import sys
 import shutil
+import logging
+from concurrent.futures import ThreadPoolExecutor
 
 class Console:
     """
@@ -79,16 +80,117 @@ class Console:
         """Performance metrics log."""
         print(f"{Console.OKCYAN}{Console.SYM_TIME} {msg}{Console.ENDC}")
 
-def get_dat_files(root_dir: str) -> List[str]:
-    
+def _scan_dir(path: str) -> Tuple[List[Tuple[str, int]], List[str]]:
+    """Lists one directory. Returns ([(dat_file, size)], sub_dirs) using cached DirEntry info."""
     dat_files = []
+    sub_dirs = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        # Same as os.walk(followlinks=False): don't descend into symlinked dirs
+                        if not entry.is_symlink():
+                            sub_dirs.append(entry.path)
+                    elif entry.name.lower().endswith(".dat"):
+                        # DirEntry.stat() is free on Windows and a single cached call elsewhere
+                        dat_files.append((entry.path, entry.stat().st_size))
+                except OSError:
+                    continue
+    except OSError as error:
+        logging.warning(f"Could not scan directory: {path} -> {error}")
+        
+    return dat_files, sub_dirs
+
+def get_dat_file_sizes(root_dir: str, max_workers: int = 8) -> Dict[str, int]:
+    """
+    Finds all .dat files in the specified directory and its subdirectories.
+    Returns {path: size in bytes}, so callers don't have to stat the files again.
+    Directories are listed level by level on a thread pool: scandir releases the GIL,
+    so stat latency (HDD seeks, network shares) overlaps instead of adding up.
+    """
+    dat_files = {}
+    frontier = [root_dir]
     
-    for root, _, files in os.walk(root_dir):
-        for file in files:
-            if file.lower().endswith(".dat"):
-                dat_files.append(os.path.join(root, file))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while frontier:
+            next_frontier = []
+            for files, sub_dirs in executor.map(_scan_dir, frontier):
+                dat_files.update(files)
+                next_frontier.extend(sub_dirs)
+            frontier = next_frontier
+            
     return dat_files
 
+def get_dat_files(root_dir: str, max_workers: int = 8) -> List[str]:
+    """Finds all .dat files in the specified directory and its subdirectories."""
+    return list(get_dat_file_sizes(root_dir, max_workers))
+
+def set_worker_affinity(worker_id: int, n_workers: int, cores_per_worker: Optional[int] = None) -> bool:
+    """
+    Pins the current process to its own slice of the available CPUs.
+    Worker N gets 'cores_per_worker' consecutive cores (default: an even share of the CPUs, wrapping
+    around if there are more workers than cores), so workers stop migrating between cores/sockets.
+    Uses os.sched_setaffinity (Linux) or psutil if installed; otherwise it is a no-op.
+    
+    Returns True if the affinity was applied.
+    """
+    try:
+        if hasattr(os, "sched_getaffinity"):
+            cpus = sorted(os.sched_getaffinity(0))
+        else:
+            import psutil
+            cpus = sorted(psutil.Process().cpu_affinity())
+    except Exception:
+        # Platform without affinity support (e.g. macOS without psutil)
+        return False
+
+    if not cpus or n_workers < 1:
+        return False
+    
+    share = len(cpus) // n_workers or 1
+    cores_per_worker = max(1, min(cores_per_worker or share, share))
+    start = (worker_id % n_workers) * cores_per_worker
+    target = {cpus[(start + i) % len(cpus)] for i in range(cores_per_worker)}
+    
+    try:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, target)
+        else:
+            import psutil
+            psutil.Process().cpu_affinity(sorted(target))
+        return True
+    except Exception as error:
+        logging.warning(f"Could not set CPU affinity for worker {worker_id}: {error}")
+        return False
+
+def can_check_pids() -> bool:
+    """True if pid_exists() can tell whether a process is running (Windows needs psutil)."""
+    if os.name != 'nt':
+        return True
+    try:
+        import psutil  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def pid_exists(pid: int) -> bool:
+    """True if a process with this pid is running. False when it can't be checked (see can_check_pids)."""
+    if os.name == 'nt':
+        try:
+            import psutil
+        except ImportError:
+            return False
+        return psutil.pid_exists(pid)
+    
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
 def clean_path(path: str) -> str:
     """Normalizes paths for display (removes distinct drive letters if needed)."""
     return os.path.normpath(path)
\ No newline at end of file
@@ -1,6 +1,6 @@
 import os
 import pytest
-from turbo_tosec.parser import InMemoryParser, _detect_file_format
+from turbo_tosec.parser import InMemoryParser, _detect_file_format, _paren_pairs, _matching_paren, _find_block_end
 
 SAMPLE_CMP_CONTENT = """clrmamepro (
     name "Commodore 64 - Games"
@@ -76,4 +76,72 @@ def test_cmp_parsing_logic(tmp_path, parser):
     assert game2[5] is None
     assert game2[7] == "game2.rom"
     assert game2[8] == 200
-    
\ No newline at end of file
+    
+def test_cmp_keywords_are_case_insensitive(tmp_path, parser):
+    """
+    Keywords match in any case while names and hashes keep their original case.
+    """
+    dat_file = tmp_path / "Commodore 64 - Games.dat"
+    dat_file.write_text(SAMPLE_CMP_CONTENT.replace("game (", "GAME (").replace("rom (", "Rom (")
+                        .replace('name "Another', 'NAME "Another'), encoding="utf-8")
+    
+    results = parser._parse_cmp(str(dat_file))
+    
+    assert len(results) == 2
+    assert results[1][3] == "Another Game"
+    assert results[1][7] == "game2.rom"
+    assert results[1][9] == "AABBCCDD"
+
+def test_cmp_rom_names_with_parentheses(tmp_path, parser):
+    """
+    A ')' inside a quoted ROM name must not end the rom entry early.
+    """
+    dat_file = tmp_path / "Commodore 64 - Games.dat"
+    dat_file.write_text(SAMPLE_CMP_CONTENT.replace('"test.zip"', '"Test Game (1986)(Publisher).zip"'), encoding="utf-8")
+    
+    results = parser._parse_cmp(str(dat_file))
+    
+    assert len(results) == 2
+    assert results[0][7] == "Test Game (1986)(Publisher).zip"
+    assert results[0][8] == 100
+    assert results[0][9] == "12345678"
+
+@pytest.mark.parametrize("data", [
+    b'game ( name "x" rom ( name "a" ) rom ( name "b" ) )',
+    b'game ( name "Game (1986)(Pub)" rom ( name "From (Disk 1).zip" size 1 ) )',  # parens inside quotes
+    b'(((()))) (()()) ()',                                                      # nested blocks
+    b'no parens at all',
+])
+def test_paren_pairs_match_block_scan(data):
+    """
+    Every '(' is paired with the same ')' the per-block balance scan finds.
+    """
+    pairs = _paren_pairs(data)
+    opens = [i for i, byte in enumerate(data) if byte == ord('(')]
+    
+    assert list(pairs[0]) == opens
+    for open_pos in opens:
+        assert _matching_paren(pairs, open_pos) == _find_block_end(data, open_pos + 1)
+    # Not an opening paren
+    assert _matching_paren(pairs, len(data)) == -1
+
+@pytest.mark.parametrize("data", [b'game ( rom ( name "a" )', b'game ( ) ) (', b')('])
+def test_paren_pairs_unbalanced(data):
+    """
+    Unbalanced parentheses (unclosed, or closed before being opened) give None: callers fall back to the block scan.
+    """
+    assert _paren_pairs(data) is None
+
+def test_cmp_unbalanced_paren_in_quotes(tmp_path, parser):
+    """
+    A stray '(' inside a quoted description unbalances the file: its game can't be closed and is skipped,
+    the following games are still parsed (per-block fallback).
+    """
+    dat_file = tmp_path / "Commodore 64 - Games.dat"
+    dat_file.write_text(SAMPLE_CMP_CONTENT.replace('"Test Game Description"', '"Broken (1986"'), encoding="utf-8")
+    
+    results = parser._parse_cmp(str(dat_file))
+    
+    assert len(results) == 1
+    assert results[0][3] == "Another Game"
+    assert results[0][7] == "game2.rom"
@@ -1,7 +1,8 @@
 import pytest
 import os
-from turbo_tosec.database import DatabaseManager
-from turbo_tosec.parser import InMemoryParser, _get_common_info
+from turbo_tosec.database import DatabaseManager, DBConfig
+from turbo_tosec.parser import InMemoryParser, TurboParser, RomColumns, _get_common_info
+from turbo_tosec.utils import get_dat_files, get_dat_file_sizes
 
 # --- Mock Data Updated for v2.0 (14 Columns) ---
 # Old: (filename, platform, game, desc, rom, size, crc, md5, sha1, status, system)
@@ -58,4 +59,226 @@ def test_platform_parsing():
     _, platform, category, _ = _get_common_info(fake_path)
     
     assert platform == "Commodore Amiga"
-    assert category == "Games - [ADF]"
\ No newline at end of file
+    assert category == "Games - [ADF]"
+
+def test_rom_columns_roundtrip(tmp_path):
+    """Tests that the columnar (SoA) buffer keeps row access and lands in the DB intact."""
+    buffer = RomColumns.from_rows(MOCK_BUFFER * 3)
+    
+    assert len(buffer) == 3
+    assert buffer[0] == MOCK_BUFFER[0]
+    assert buffer.to_arrow().num_rows == 3
+    
+    db_path = str(tmp_path / "test.duckdb")
+    with DatabaseManager(db_path) as db:
+        db.insert_batch(buffer)
+        count = db.conn.execute("SELECT count(*) FROM roms WHERE size = 500").fetchone()[0]
+        assert count == 3
+    
+    buffer.clear()
+    assert len(buffer) == 0
+
+def test_filter_unprocessed(tmp_path):
+    """Tests that the resume filter drops already imported DAT files and keeps input order."""
+    db_path = str(tmp_path / "test.duckdb")
+    paths = ["/dats/b/Zeta.dat", "/dats/a/Amiga.dat", "/dats/a/Beta.dat"]
+    
+    with DatabaseManager(db_path) as db:
+        assert db.filter_unprocessed(paths) == paths
+        assert db.count_processed_files() == 0
+        
+        db.insert_batch(MOCK_BUFFER)  # Marks 'Amiga.dat' as processed
+        assert db.count_processed_files() == 1
+        assert db.filter_unprocessed(paths) == ["/dats/b/Zeta.dat", "/dats/a/Beta.dat"]
+        assert db.filter_unprocessed([]) == []
+
+def test_transaction_commits_and_rolls_back(tmp_path):
+    """Tests periodic commits inside an explicit transaction and rollback on failure."""
+    db_path = str(tmp_path / "test.duckdb")
+    
+    with DatabaseManager(db_path) as db:
+        with db.transaction(commit_every=1):
+            db.insert_batch(MOCK_BUFFER)
+            db.insert_batch(MOCK_BUFFER)
+        assert db.conn.execute("SELECT count(*) FROM roms").fetchone()[0] == 2
+        
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.insert_batch(MOCK_BUFFER)
+                raise RuntimeError("boom")
+        assert db.conn.execute("SELECT count(*) FROM roms").fetchone()[0] == 2
+
+def test_metadata_upserts(tmp_path):
+    """Tests that metadata upserts insert and then overwrite a key."""
+    with DatabaseManager(str(tmp_path / "test.duckdb")) as db:
+        assert db.get_metadata_value("tosec_version") is None
+        
+        db.set_metadata_value("tosec_version", "TOSEC-v2023-01-01")
+        db.set_metadata_value("tosec_version", "TOSEC-v2024-01-01")
+        assert db.get_metadata_value("tosec_version") == "TOSEC-v2024-01-01"
+
+def test_get_dat_file_sizes(tmp_path):
+    """Tests that the directory scan finds nested .dat files and reports their sizes."""
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.dat").write_bytes(b"1234")
+    (tmp_path / "sub" / "B.DAT").write_bytes(b"12")
+    (tmp_path / "notes.txt").write_bytes(b"x")
+    
+    sizes = get_dat_file_sizes(str(tmp_path))
+    assert sizes == {str(tmp_path / "a.dat"): 4, str(tmp_path / "sub" / "B.DAT"): 2}
+    assert sorted(get_dat_files(str(tmp_path))) == sorted(sizes)
+
+def test_parse_many_and_save_skips_broken_files(tmp_path):
+    """Tests that grouped staging writes one Parquet file and leaves out the rows of a broken DAT."""
+    good = tmp_path / "Commodore Amiga - Games (TOSEC).dat"
+    good.write_text("<?xml version='1.0'?><datafile><game name='G (1990)'><rom name='a' size='1'/><rom name='b' size='2'/></game></datafile>")
+    broken = tmp_path / "broken.dat"
+    broken.write_text("<?xml version='1.0'?><datafile><game name='x'><rom name='a' size='1'/>")
+    out_dir = tmp_path / "stage"
+    
+    results = TurboParser().parse_many_and_save([str(good), str(broken), str(good)], str(out_dir))
+    
+    assert [stats["roms"] if stats else None for stats, _ in results] == [2, None, 2]
+    assert results[1][1] is not None
+    assert len(os.listdir(out_dir)) == 1
+    
+    with DatabaseManager(str(tmp_path / "test.duckdb")) as db:
+        db.import_from_parquet_folder(str(out_dir))
+        assert db.conn.execute("SELECT count(*) FROM roms").fetchone()[0] == 4
+    
+    # Writing the group fails: every file reports it and no partial file is left behind
+    def fail(output_path):
+        raise OSError("disk full")
+    parser = TurboParser()
+    parser._open_chunk_writer = fail
+    results = parser.parse_many_and_save([str(good), str(good)], str(tmp_path / "failed"))
+    assert [(stats, str(error)) for stats, error in results] == [(None, "disk full")] * 2
+    assert os.listdir(tmp_path / "failed") == []
+
+def test_transaction_recovers_from_failed_statement(tmp_path):
+    """Tests that a caught insert error mid-transaction doesn't abort (and silently drop) the later batches."""
+    import pyarrow as pa
+    from turbo_tosec.parser import ROM_ARROW_SCHEMA
+    
+    def rows(filename):
+        return [(filename,) + MOCK_BUFFER[0][1:]]
+    
+    # 'size' column that can't be converted to BIGINT
+    bad = pa.table({name: pa.array(["not a number"]) if name == "size" else pa.array([None], pa.string()) 
+                    for name in ROM_ARROW_SCHEMA.names})
+    
+    with DatabaseManager(str(tmp_path / "test.duckdb")) as db:
+        with db.transaction(commit_every=100):
+            db.insert_batch(rows("a.dat"))
+            with pytest.raises(Exception):
+                db.insert_arrow(bad)
+            db.insert_batch(rows("b.dat"))
+        
+        # a.dat shared the aborted transaction: rolled back and reported, b.dat is committed
+        assert db.rolled_back_rows == 1
+        assert db.conn.execute("SELECT dat_filename FROM roms").fetchall() == [("b.dat",)]
+        assert db.conn.execute("SELECT filename FROM processed_files").fetchall() == [("b.dat",)]
+
+def test_xml_external_entities_are_not_resolved(tmp_path):
+    """Tests that a DAT can't pull local files into the database through an external entity."""
+    secret = tmp_path / "secret.txt"
+    secret.write_text("TOP-SECRET")
+    dat = tmp_path / "evil.dat"
+    dat.write_text(f'<?xml version="1.0"?><!DOCTYPE d [<!ENTITY x SYSTEM "{secret.as_uri()}">]>'
+                   '<datafile><game name="&x;"><rom name="a" size="1"/></game></datafile>')
+    
+    rows = InMemoryParser().parse(str(dat))
+    assert all("TOP-SECRET" not in str(row) for row in rows)
+
+def test_temp_directory_with_quote(tmp_path):
+    """A quote in the spill path must not break (or inject into) the connection setup."""
+    temp_dir = str(tmp_path / "it's tmp")
+    config = DBConfig(turbo=True, memory="256MB", temp_directory=temp_dir)
+    with DatabaseManager(str(tmp_path / "test.duckdb"), config) as db:
+        assert db.conn.execute("SELECT current_setting('temp_directory')").fetchone()[0] == temp_dir
+
+def test_stage_in_memory_round_trip(tmp_path):
+    """Tests that an in-memory staged session keeps the existing rows and indexes and writes everything back on close."""
+    import duckdb
+    db_path = str(tmp_path / "test.duckdb")
+    with DatabaseManager(db_path) as db:
+        db.insert_batch(MOCK_BUFFER)
+        db.create_indexes()
+    
+    rows = [("b.dat",) + MOCK_BUFFER[0][1:]] * 3
+    with DatabaseManager(db_path, DBConfig(stage_in_memory=True)) as db:
+        assert db.staged_in_memory
+        db.insert_batch(rows)
+    
+    conn = duckdb.connect(db_path)
+    try:
+        assert conn.execute("SELECT count(*) FROM roms").fetchone()[0] == 4
+        assert conn.execute("SELECT count(*) FROM processed_files").fetchone()[0] == 2
+        indexes = {name for (name,) in conn.execute("SELECT index_name FROM duckdb_indexes() WHERE table_name = 'roms'").fetchall()}
+        assert indexes == {"idx_roms_sha1", "idx_roms_crc_size"}
+    finally:
+        conn.close()
+
+def test_stage_in_memory_discards_on_error(tmp_path):
+    """Tests that an in-memory staged session leaving with an exception doesn't write to the file (a quoted path attaches too)."""
+    db_path = str(tmp_path / "it's.duckdb")
+    with DatabaseManager(db_path) as db:
+        db.insert_batch(MOCK_BUFFER)
+    
+    with pytest.raises(RuntimeError):
+        with DatabaseManager(db_path, DBConfig(stage_in_memory=True)) as db:
+            db.insert_batch([("b.dat",) + MOCK_BUFFER[0][1:]] * 3)
+            raise RuntimeError("interrupted")
+    
+    with DatabaseManager(db_path) as db:
+        assert db.conn.execute("SELECT count(*) FROM roms").fetchone()[0] == 1
+        assert db.count_processed_files() == 1
+
+def test_rolled_back_files_are_taken_out_completely(tmp_path):
+    """Tests that files caught in a rolled back batch lose their earlier committed rows and marks too, so a resume redoes them."""
+    import pyarrow as pa
+    from turbo_tosec.parser import ROM_ARROW_SCHEMA
+    
+    def rows(*filenames):
+        return [(filename,) + MOCK_BUFFER[0][1:] for filename in filenames]
+    
+    bad = pa.table({name: pa.array(["not a number"]) if name == "size" else pa.array([None], pa.string()) 
+                    for name in ROM_ARROW_SCHEMA.names})
+    
+    with DatabaseManager(str(tmp_path / "test.duckdb")) as db:
+        with db.transaction(commit_every=2):
+            db.insert_batch(rows("a.dat"))
+            db.insert_batch(rows("a.dat", "b.dat"))  # commits the first batch
+            with pytest.raises(Exception):
+                db.insert_arrow(bad)
+            db.insert_batch(rows("c.dat"))
+        
+        assert db.rolled_back_files == ["a.dat", "b.dat"]
+        assert db.rolled_back_rows == 3
+        assert db.conn.execute("SELECT dat_filename FROM roms").fetchall() == [("c.dat",)]
+        assert db.conn.execute("SELECT filename FROM processed_files").fetchall() == [("c.dat",)]
+        assert db.filter_unprocessed(["/x/a.dat", "/x/b.dat", "/x/c.dat"]) == ["/x/a.dat", "/x/b.dat"]
+
+def test_threads_capped_by_memory_limit(tmp_path):
+    """Tests that the DB thread count is capped to what the memory limit can feed, and not capped without a limit."""
+    def threads(config):
+        with DatabaseManager(str(tmp_path / "test.duckdb"), config) as db:
+            return db.conn.execute("SELECT current_setting('threads')").fetchone()[0]
+    
+    # 512MB feeds 4 threads of ~125MB
+    assert threads(DBConfig(turbo=True, memory="512MB", threads=16)) == 4
+    assert threads(DBConfig(turbo=True, memory="8GB", threads=16)) == 16
+    # Safe mode sets no memory limit
+    assert threads(DBConfig(turbo=False, memory="512MB", threads=16)) == 16
+
+def test_import_from_parquet_restores_insertion_order(tmp_path):
+    """Tests that a Parquet restore doesn't leave preserve_insertion_order switched off on the connection."""
+    parquet_path = str(tmp_path / "roms.parquet")
+    with DatabaseManager(str(tmp_path / "source.duckdb")) as db:
+        db.insert_batch(MOCK_BUFFER)
+        db.export_to_parquet(parquet_path)
+    
+    with DatabaseManager(str(tmp_path / "test.duckdb")) as db:
+        db.import_from_parquet(parquet_path)
+        assert db.conn.execute("SELECT count(*) FROM roms").fetchone()[0] == 1
+        assert db.conn.execute("SELECT current_setting('preserve_insertion_order')").fetchone()[0] is True
@@ -0,0 +1,191 @@
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+import pytest
+from turbo_tosec.database import DatabaseManager
+from turbo_tosec.parser import RomColumns, TurboParser
+from turbo_tosec.utils import set_worker_affinity
+from turbo_tosec.session import ImportSession, _WorkerPool, _bounded_map, _claim_affinity_slot
+
+@pytest.fixture
+def dat_dir(tmp_path):
+    """Five small DATs plus one broken one."""
+    dats = tmp_path / "dats"
+    dats.mkdir()
+    for i in range(5):
+        roms = "".join(f"<rom name='r{j}' size='{j}' crc='{i:04x}{j:04x}'/>" for j in range(7))
+        (dats / f"Commodore Amiga - Games - Set {i} (TOSEC).dat").write_text(
+            f"<?xml version='1.0'?><datafile><game name='Game {i} (1990)'>{roms}</game></datafile>")
+    (dats / "broken.dat").write_text("<?xml version='1.0'?><datafile><game name='x'><rom name='a' size='1'/>")
+    return sorted(str(path) for path in dats.iterdir())
+
+def _ingest(tmp_path, files, mode, name, workers=1, **kwargs):
+    with DatabaseManager(str(tmp_path / f"{name}.duckdb")) as db:
+        session = ImportSession(db, **kwargs)
+        session.workers = workers  # (not capped to this machine's CPU count)
+        stats = session.ingest(files, mode=mode)
+        rows = db.conn.execute("SELECT * FROM roms ORDER BY dat_filename, rom_name").fetchall()
+    return stats, rows
+
+def test_claim_affinity_slot_reuses_exited_workers():
+    """Tests that a replacement worker takes the slot of an exited worker, not one still in use."""
+    child = subprocess.Popen([sys.executable, "-c", "pass"])
+    child.wait()
+    
+    slots = multiprocessing.Array('i', [os.getppid(), child.pid])
+    assert _claim_affinity_slot(slots) == 1
+    assert list(slots) == [os.getppid(), os.getpid()]
+    
+    # Every slot owned by a live process: no pinning
+    assert _claim_affinity_slot(multiprocessing.Array('i', [os.getppid()])) is None
+
+def test_affinity_is_opt_in_and_split_by_workers(tmp_path, monkeypatch):
+    """Tests that workers aren't pinned by default, and that a pinned worker gets its share of the CPUs, not db_threads cores."""
+    with DatabaseManager(str(tmp_path / "test.duckdb")) as db:
+        assert not ImportSession(db).affinity
+    
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(8)), raising=False)
+    applied = []
+    monkeypatch.setattr(os, "sched_setaffinity", lambda pid, cpus: applied.append(cpus), raising=False)
+    assert set_worker_affinity(1, 2)
+    assert applied == [{4, 5, 6, 7}]
+
+def test_direct_mode_matches_legacy(tmp_path, dat_dir):
+    """Tests that the producer/consumer path imports the same rows as the legacy parser and skips the broken DAT."""
+    # A tiny flush threshold makes the producer hand over several batches through the queue
+    direct_stats, direct_rows = _ingest(tmp_path, dat_dir, 'direct', "direct", direct_flush_threshold=3)
+    legacy_stats, legacy_rows = _ingest(tmp_path, dat_dir, 'legacy', "legacy")
+    
+    assert direct_stats == {'total_roms': 35, 'errors': 1}
+    assert len(direct_rows) == 35
+    assert direct_rows == legacy_rows
+    
+    # Worker pool feeding the producer thread
+    assert _ingest(tmp_path, dat_dir, 'direct', "pool", workers=2, direct_flush_threshold=3) == (direct_stats, direct_rows)
+
+def test_direct_mode_reraises_producer_failure(tmp_path, dat_dir, monkeypatch):
+    """Tests that an error outside the per-file handling is raised on the calling thread, not lost in the producer."""
+    def fail(capacity):
+        raise MemoryError("no room for the batch buffer")
+    monkeypatch.setattr(RomColumns, "with_capacity", staticmethod(fail))
+    
+    with pytest.raises(MemoryError, match="no room"):
+        _ingest(tmp_path, dat_dir, 'direct', "direct")
+
+def test_direct_mode_reports_every_file_of_a_failed_batch(tmp_path, dat_dir, monkeypatch):
+    """Tests that a failed insert fails the files whose rows were in that batch, and the import goes on."""
+    insert_arrow = DatabaseManager.insert_arrow
+    failed = []
+    
+    def fail_set_2(self, table):
+        names = set(table.column("filename").to_pylist())
+        if any("Set 2" in name for name in names):
+            failed.extend(names)
+            raise RuntimeError("Conversion Error")
+        insert_arrow(self, table)
+    monkeypatch.setattr(DatabaseManager, "insert_arrow", fail_set_2)
+    
+    # 10-row batches: Set 2's rows share batches with Sets 1, 3 and 4
+    stats, rows = _ingest(tmp_path, dat_dir, 'direct', "direct", direct_flush_threshold=10)
+    
+    # Batches: Set 0+1 | Set 1+2 (fails) | Set 2+3+4 (fails) | rest of Set 4
+    assert len(set(failed)) == 4
+    assert stats == {'total_roms': 15, 'errors': 1 + 4}
+    assert len(rows) == 15
+
+def test_direct_mode_stops_producer_on_full_disk(tmp_path, dat_dir, monkeypatch):
+    """Tests that a fatal insert error ends the run and stops the producer (blocked on the full queue) instead of hanging."""
+    def fail(self, table):
+        raise OSError("IO Error: not enough space on the disk")
+    monkeypatch.setattr(DatabaseManager, "insert_arrow", fail)
+    
+    with pytest.raises(OSError, match="CRITICAL"):
+        _ingest(tmp_path, dat_dir * 4, 'direct', "direct", direct_flush_threshold=1)
+    assert not any(thread.name == "direct-parser" for thread in threading.enumerate())
+
+def test_progress_callback_runs_on_calling_thread(tmp_path, dat_dir):
+    """Tests that sizes found by the background sizer reach a GUI callback on the caller's thread, not the sizer's."""
+    calls = []
+    with DatabaseManager(str(tmp_path / "test.duckdb")) as db:
+        ImportSession(db, workers=1).ingest(dat_dir, mode='direct',
+                                            progress_callback=lambda current, total: calls.append((threading.get_ident(), total)))
+    
+    assert calls
+    assert {ident for ident, _ in calls} == {threading.get_ident()}
+    assert calls[-1][1] == sum(os.path.getsize(path) for path in dat_dir)
+
+def _double_or_die(item):
+    if item < 0:
+        os._exit(1)  # a worker killed mid-task (segfault, OOM kill)
+    return item * 2
+
+def test_bounded_map_survives_a_killed_worker():
+    """Tests that a dead worker fails only the item it was running; the pool is replaced and the map goes on in order."""
+    pool = _WorkerPool(partial(concurrent.futures.ProcessPoolExecutor, max_workers=2, 
+                               mp_context=multiprocessing.get_context("fork")))
+    try:
+        results = list(_bounded_map(pool, _double_or_die, [1, 2, 3, -1, 4, 5, 6, 7], window=2, chunksize=2,
+                                    on_error=lambda item, error: ("failed", item, type(error).__name__)))
+    finally:
+        pool.shutdown()
+    
+    assert results == [2, 4, 6, ("failed", -1, "BrokenProcessPool"), 8, 10, 12, 14]
+    
+    # Without on_error the failure still reaches the caller
+    pool = _WorkerPool(partial(concurrent.futures.ProcessPoolExecutor, max_workers=1, 
+                               mp_context=multiprocessing.get_context("fork")))
+    try:
+        with pytest.raises(BrokenProcessPool):
+            list(_bounded_map(pool, _double_or_die, [1, -1], window=1))
+    finally:
+        pool.shutdown()
+
+def test_parallel_ingest_without_main_guard(tmp_path, dat_dir):
+    """Tests that a library script without an 'if __name__ == "__main__"' guard can run a worker pool by default."""
+    script = tmp_path / "script.py"
+    script.write_text(textwrap.dedent(f"""
+        from turbo_tosec.database import DatabaseManager
+        from turbo_tosec.session import ImportSession
+        with DatabaseManager({str(tmp_path / "test.duckdb")!r}) as db:
+            session = ImportSession(db, temp_dir={str(tmp_path / "stage")!r})
+            session.workers = 2
+            print(session.ingest({dat_dir!r}, mode="staged"))
+    """))
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    result = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, timeout=120,
+                            env={**os.environ, "PYTHONPATH": src})
+    
+    assert result.returncode == 0, result.stderr
+    assert "{'total_roms': 35, 'errors': 1}" in result.stdout
+
+def test_staged_mode_with_broken_file_in_group(tmp_path, dat_dir):
+    """Tests staged mode end to end: a corrupt DAT grouped with a good one fails alone, the rest is imported."""
+    # One worker, no sizes: files are grouped two by two, the broken DAT shares a group with Set 4
+    stats, rows = _ingest(tmp_path, dat_dir, 'staged', "staged", temp_dir=str(tmp_path / "stage"))
+    _, legacy_rows = _ingest(tmp_path, dat_dir, 'legacy', "legacy")
+    
+    assert stats == {'total_roms': 35, 'errors': 1}
+    assert rows == legacy_rows
+
+def test_staged_mode_group_write_failure(tmp_path, dat_dir, monkeypatch):
+    """Tests that a failing group writer fails that group's files instead of aborting; a full disk still aborts."""
+    def fail(cls, output_path):
+        raise ValueError("Table schema does not match")
+    monkeypatch.setattr(TurboParser, "_open_chunk_writer", classmethod(fail))
+    
+    stats, rows = _ingest(tmp_path, dat_dir, 'staged', "staged", temp_dir=str(tmp_path / "stage"))
+    assert stats == {'total_roms': 0, 'errors': 6}
+    assert rows == []
+    
+    def disk_full(cls, output_path):
+        raise OSError("IO Error: not enough space on the disk")
+    monkeypatch.setattr(TurboParser, "_open_chunk_writer", classmethod(disk_full))
+    
+    with pytest.raises(OSError, match="CRITICAL"):
+        _ingest(tmp_path, dat_dir, 'staged', "full", temp_dir=str(tmp_path / "stage"))